@@ -43,20 +43,39 @@ class DiskManager:
             raise ValueError("El rango solicitado excede el tamaño del dispositivo")
         return self.get_segment(offset, size)
 
-    def iter_segments(self, overlap: int = 0):
-        """Itera segmentos de tamaño block_size con soporte opcional de solapamiento."""
+    def iter_segments(self, overlap: int = 0, start: int = 0, stop: int | None = None):
+        """
+        Itera segmentos de tamaño block_size con soporte opcional de solapamiento,
+        desde `start` y hasta `stop` (fin del dispositivo si es None).
+        """
         if overlap < 0:
             raise ValueError("overlap debe ser un valor no negativo")
 
-        offset = 0
-        while offset < self.size:
-            length = min(self.block_size, self.size - offset)
+        end = self.size if stop is None else min(stop, self.size)
+        offset = start
+        while offset < end:
+            if self.block_size - overlap <= 0:
+                raise ValueError("overlap debe ser menor que block_size")
+            length = min(self.block_size, end - offset)
             segment = self.get_segment(offset, length)
             yield offset, segment
-            step = self.block_size - overlap
-            if step <= 0:
-                raise ValueError("overlap debe ser menor que block_size")
-            offset += step
+            # Un segmento corto solo puede ser el último.
+            if length <= overlap or (offset + length >= end and length < self.block_size):
+                break
+            # El avance usa la longitud entregada: block_size puede cambiar entre segmentos.
+            offset += length - overlap
+
+    def release_range(self, start_offset: int, length: int) -> None:
+        """
+        Indica al kernel que las páginas del rango ya no se necesitan (MADV_DONTNEED),
+        para que las zonas ya escaneadas dejen de contar en el RSS del proceso.
+        """
+        if self.mapped_device is None or not hasattr(mmap, "MADV_DONTNEED"):
+            return
+        start = start_offset - start_offset % mmap.PAGESIZE
+        end = min(start_offset + length, self.size)
+        if end > start:
+            self.mapped_device.madvise(mmap.MADV_DONTNEED, start, end - start)
 
     def get_device_metadata(self) -> dict:
         """Retorna metadata básica útil para cadena de custodia."""
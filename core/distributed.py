@@ -0,0 +1,275 @@
+import json
+import logging
+import socket
+import socketserver
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Any, Callable
+
+DEFAULT_RANGE_SIZE = 1024 * 1024 * 1024
+DEFAULT_LEASE_TTL = 300.0
+SOCKET_TIMEOUT = 30.0
+# Esperas entre reintentos de un worker ante fallos de conexión con el coordinador.
+RETRY_DELAYS = (0.5, 1.0, 2.0, 4.0, 8.0)
+# Intervalos de sondeo que el coordinador sigue atendiendo, como máximo, tras completar todos los rangos.
+DRAIN_POLLS = 4
+
+# (start, stop, heartbeat) -> fragmento de reporte (entradas de ForensicReporter)
+RangeScanner = Callable[[int, int, Callable[[], None]], list[dict[str, Any]]]
+
+
+def parse_address(address: str) -> tuple[str, int]:
+    """Convierte `host:puerto` en tupla para sockets."""
+    host, _, port = address.rpartition(":")
+    if not host or not port.isdigit():
+        raise ValueError(f"Dirección inválida (se espera host:puerto): {address}")
+    return host, int(port)
+
+
+def send_message(address: tuple[str, int], message: dict[str, Any]) -> dict[str, Any]:
+    """Envía un mensaje JSON (una línea) y espera la respuesta en la misma conexión."""
+    with socket.create_connection(address, timeout=SOCKET_TIMEOUT) as connection:
+        connection.sendall(json.dumps(message).encode("utf-8") + b"\n")
+        with connection.makefile("rb") as stream:
+            line = stream.readline()
+    if not line:
+        raise ConnectionError("El coordinador cerró la conexión sin responder")
+    return json.loads(line)
+
+
+class _CoordinatorHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        line = self.rfile.readline()
+        if not line:
+            return
+        try:
+            response = self.server.coordinator.handle_message(json.loads(line))
+        except (ValueError, KeyError, TypeError) as error:
+            response = {"error": str(error)}
+        self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+
+
+class _CoordinatorServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class ScanCoordinator:
+    """
+    Divide la imagen en rangos de bytes y los arrienda (lease) a workers por TCP.
+    Cada worker es responsable de los headers que comienzan dentro de su rango y
+    lee más allá de `stop` lo necesario para cerrar sus candidatos (solapamiento).
+    Los leases vencidos vuelven a la cola y se re-emiten a otro worker.
+    """
+
+    def __init__(
+        self,
+        image_size: int,
+        range_size: int = DEFAULT_RANGE_SIZE,
+        lease_ttl: float = DEFAULT_LEASE_TTL,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        if range_size <= 0:
+            raise ValueError("range_size debe ser mayor que cero")
+        self.image_size = image_size
+        self.lease_ttl = lease_ttl
+        self.ranges = [(start, min(start + range_size, image_size)) for start in range(0, image_size, range_size)]
+        self._pending: deque[int] = deque(range(len(self.ranges)))
+        self._leases: dict[str, tuple[int, float]] = {}
+        # Todo lease emitido (también los vencidos) -> rango; un `complete` solo se acepta con uno de ellos.
+        self._issued: dict[str, int] = {}
+        self._results: dict[int, list[dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+        self._complete = threading.Event()
+        if not self.ranges:
+            self._complete.set()
+
+        self.poll_interval = min(1.0, lease_ttl / 4)
+        self.server = _CoordinatorServer((host, port), _CoordinatorHandler)
+        self.server.coordinator = self
+
+    @property
+    def address(self) -> tuple[str, int]:
+        return self.server.server_address[:2]
+
+    def _reclaim_expired(self, now: float) -> None:
+        for lease_id, (range_index, deadline) in list(self._leases.items()):
+            if deadline <= now:
+                del self._leases[lease_id]
+                if range_index not in self._results:
+                    logging.warning("[Coordinator] Lease %s vencido; re-emitiendo rango %d", lease_id, range_index)
+                    self._pending.append(range_index)
+
+    def handle_message(self, message: dict[str, Any]) -> dict[str, Any]:
+        operation = message["op"]
+        with self._lock:
+            now = time.monotonic()
+            self._reclaim_expired(now)
+
+            if operation == "lease":
+                if self._complete.is_set():
+                    return {"done": True}
+                if not self._pending:
+                    return {"wait": self.poll_interval}
+                range_index = self._pending.popleft()
+                lease_id = uuid.uuid4().hex
+                self._leases[lease_id] = (range_index, now + self.lease_ttl)
+                self._issued[lease_id] = range_index
+                start, stop = self.ranges[range_index]
+                logging.info("[Coordinator] Rango %d [%d, %d) arrendado a %s", range_index, start, stop, message.get("worker"))
+                return {
+                    "lease": lease_id,
+                    "range": range_index,
+                    "start": start,
+                    "stop": stop,
+                    "size": self.image_size,
+                    "ttl": self.lease_ttl,
+                }
+
+            if operation == "renew":
+                lease = self._leases.get(message["lease"])
+                # Vencido (y quizá re-emitido) o rango ya completado por otro worker: el worker debe abandonarlo.
+                if lease is None or lease[0] in self._results:
+                    self._leases.pop(message["lease"], None)
+                    return {"ok": False}
+                self._leases[message["lease"]] = (lease[0], now + self.lease_ttl)
+                return {"ok": True}
+
+            if operation == "complete":
+                range_index = int(message["range"])
+                if self._issued.get(message["lease"]) != range_index:
+                    raise ValueError(f"El lease {message['lease']} no fue emitido para el rango {range_index}")
+                self._leases.pop(message["lease"], None)
+                # Un rango re-emitido puede completarse dos veces; se conserva el primer resultado.
+                if range_index not in self._results:
+                    self._results[range_index] = list(message["entries"])
+                    if range_index in self._pending:
+                        self._pending.remove(range_index)
+                if len(self._results) == len(self.ranges):
+                    self._complete.set()
+                return {"ok": True}
+
+        raise ValueError(f"Operación desconocida: {operation}")
+
+    def _drain(self) -> None:
+        """
+        Tras completar sigue atendiendo al menos dos intervalos de sondeo, para que los workers
+        reciban `done` en lugar de encontrar el servidor cerrado, y hasta que se cierren los leases
+        duplicados (rechazados al renovar, completados o vencidos). La espera se limita a
+        DRAIN_POLLS intervalos: un worker caído con un lease re-emitido no retrasa el reporte.
+        """
+        started = time.monotonic()
+        while True:
+            elapsed = time.monotonic() - started
+            if elapsed >= DRAIN_POLLS * self.poll_interval:
+                break
+            with self._lock:
+                self._reclaim_expired(time.monotonic())
+                idle = not self._leases
+            if idle and elapsed >= 2 * self.poll_interval:
+                break
+            time.sleep(min(0.05, self.poll_interval))
+
+    def serve_until_complete(self, timeout: float | None = None) -> list[list[dict[str, Any]]]:
+        """Atiende workers hasta completar todos los rangos y retorna los fragmentos por rango."""
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            if not self._complete.wait(timeout):
+                raise TimeoutError("No se completaron todos los rangos dentro del tiempo límite")
+            self._drain()
+        finally:
+            self.server.shutdown()
+            self.server.server_close()
+            thread.join()
+        return [self._results[index] for index in range(len(self.ranges))]
+
+
+class LeaseLost(RuntimeError):
+    """El coordinador rechazó renovar el lease: el rango venció o ya fue completado por otro worker."""
+
+
+def _request(address: tuple[str, int], message: dict[str, Any]) -> dict[str, Any]:
+    """send_message con reintentos y espera creciente ante fallos de conexión transitorios."""
+    for delay in RETRY_DELAYS:
+        try:
+            return send_message(address, message)
+        except OSError as error:
+            logging.warning("[Worker] Sin conexión con el coordinador (%s); reintento en %.1f s", error, delay)
+            time.sleep(delay)
+    return send_message(address, message)
+
+
+def run_worker(
+    address: tuple[str, int],
+    scan: RangeScanner,
+    image_size: int | None = None,
+    worker_id: str | None = None,
+) -> int:
+    """
+    Solicita leases al coordinador y escanea cada rango con `scan` hasta recibir `done`.
+    Retorna la cantidad de rangos completados por este worker. Si el coordinador sigue
+    inaccesible tras los reintentos y este worker aún no entregó ningún rango se propaga
+    el OSError; si ya entregó alguno, se asume que el coordinador terminó y cerró.
+    """
+    worker_id = worker_id or f"{socket.gethostname()}-{uuid.uuid4().hex[:8]}"
+    completed = 0
+
+    def request(message: dict[str, Any]) -> dict[str, Any] | None:
+        try:
+            return _request(address, message)
+        except OSError as error:
+            if not completed:
+                raise
+            logging.info("[Worker] Coordinador inaccesible tras entregar resultados (%s); se da por terminado", error)
+            return None
+
+    while True:
+        response = request({"op": "lease", "worker": worker_id})
+        if response is None:
+            return completed
+        if "error" in response:
+            raise RuntimeError(f"El coordinador rechazó la solicitud: {response['error']}")
+        if response.get("done"):
+            return completed
+        if "wait" in response:
+            time.sleep(response["wait"])
+            continue
+        if image_size is not None and response["size"] != image_size:
+            raise ValueError("El tamaño de la imagen del worker no coincide con el del coordinador")
+
+        lease_id = response["lease"]
+        renew_every = response["ttl"] / 3
+        last_renew = time.monotonic()
+
+        def heartbeat() -> None:
+            nonlocal last_renew
+            now = time.monotonic()
+            if now - last_renew < renew_every:
+                return
+            try:
+                renewed = _request(address, {"op": "renew", "lease": lease_id})
+            except OSError as error:
+                # El escaneo continúa; si el lease vence, el coordinador lo decidirá al completar.
+                logging.warning("[Worker] No se pudo renovar el lease %s: %s", lease_id, error)
+                return
+            if not renewed.get("ok"):
+                raise LeaseLost(f"Lease {lease_id} rechazado por el coordinador")
+            last_renew = now
+
+        try:
+            entries = scan(response["start"], response["stop"], heartbeat)
+        except LeaseLost as error:
+            logging.warning("[Worker] %s; se abandona el rango %d", error, response["range"])
+            continue
+
+        result = request({"op": "complete", "lease": lease_id, "range": response["range"], "entries": entries})
+        if result is None:
+            return completed
+        if "error" in result:
+            logging.warning("[Worker] Resultado del rango %d rechazado: %s", response["range"], result["error"])
+            continue
+        completed += 1
@@ -0,0 +1,133 @@
+import logging
+import os
+from typing import Callable
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+MIN_BLOCK_SIZE = 64 * 1024
+MIN_WINDOW_SIZE = 256 * 1024
+ALIGNMENT = 4096
+# Copias por bloque escaneado: bytes(cola + bloque) y su decodificación latin-1 para el autómata.
+BLOCK_COPY_FACTOR = 2
+# Copias por candidato: la vista acotada se materializa (tobytes) en la validación estructural.
+WINDOW_COPY_FACTOR = 2
+HIGH_PRESSURE = 0.9
+MEDIUM_PRESSURE = 0.7
+SIZE_UNITS = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3, "T": 1024 ** 4}
+
+
+def parse_size(value: str) -> int:
+    """Convierte tamaños como `2G`, `512M` o `1048576` a bytes."""
+    text = value.strip().upper().removesuffix("B")
+    multiplier = SIZE_UNITS.get(text[-1:], 1)
+    number = text[:-1] if text[-1:] in SIZE_UNITS else text
+    try:
+        size = int(float(number) * multiplier)
+    except ValueError:
+        raise ValueError(f"Tamaño inválido: {value}") from None
+    if size <= 0:
+        raise ValueError("El tamaño debe ser mayor que cero")
+    return size
+
+
+def current_rss() -> int:
+    """RSS actual del proceso; si /proc no está disponible se usa el pico (getrusage)."""
+    try:
+        with open("/proc/self/statm", encoding="ascii") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        if resource is None:
+            return 0
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reporta KiB; macOS, bytes.
+        return peak if peak > 1 << 32 else peak * 1024
+
+
+def _align_down(value: int) -> int:
+    return max(ALIGNMENT, value - value % ALIGNMENT)
+
+
+class MemoryGovernor:
+    """
+    Mantiene el escaneo dentro de un presupuesto de memoria. Tras cada bloque mide el RSS
+    (que ya incluye los buffers del lector, los validadores y el reporter; `track` permite
+    desglosarlos en el log) y ajusta el tamaño de bloque, el tope de ventana por candidato
+    y la cantidad de candidatos en vuelo.
+    """
+
+    def __init__(
+        self,
+        budget_bytes: int,
+        block_size: int,
+        rss_reader: Callable[[], int] = current_rss,
+    ):
+        self.budget_bytes = budget_bytes
+        self.max_block_size = block_size
+        self.block_size = block_size
+        self.window_cap: int | None = None
+        self.max_in_flight: int | None = None
+        self.peak_usage = 0
+        # Candidatos resueltos antes de escanear su ventana completa; `truncated` son los que
+        # además se acotaron a lo ya escaneado porque su footer todavía no estaba indexado.
+        self.resolved_early = 0
+        self.truncated = 0
+        self._rss_reader = rss_reader
+        self._trackers: dict[str, Callable[[], int]] = {}
+
+    def track(self, name: str, footprint: Callable[[], int]) -> None:
+        """Registra un componente que reporta (en bytes) la memoria que mantiene retenida."""
+        self._trackers[name] = footprint
+
+    def outstanding(self) -> dict[str, int]:
+        return {name: footprint() for name, footprint in self._trackers.items()}
+
+    def usage(self) -> int:
+        return self._rss_reader()
+
+    def update(self) -> None:
+        """Recalcula los límites a partir del uso actual; llamar tras cada bloque escaneado."""
+        usage = self.usage()
+        self.peak_usage = max(self.peak_usage, usage)
+        pressure = usage / self.budget_bytes
+        headroom = max(0, self.budget_bytes - usage)
+
+        # Las copias de bloque y de ventana no deben consumir más de la mitad del margen libre.
+        block_size = min(self.max_block_size, max(MIN_BLOCK_SIZE, _align_down(headroom // (4 * BLOCK_COPY_FACTOR))))
+        window_cap = max(MIN_WINDOW_SIZE, _align_down(headroom // (4 * WINDOW_COPY_FACTOR)))
+
+        if pressure >= HIGH_PRESSURE:
+            max_in_flight = 64
+        elif pressure >= MEDIUM_PRESSURE:
+            max_in_flight = 1024
+        else:
+            max_in_flight = None
+
+        if block_size != self.block_size or max_in_flight != self.max_in_flight:
+            logging.info(
+                "[Memory] uso %d/%d bytes: bloque %d -> %d, tope de ventana %d, candidatos en vuelo %s (%s)",
+                usage,
+                self.budget_bytes,
+                self.block_size,
+                block_size,
+                window_cap,
+                max_in_flight if max_in_flight is not None else "sin límite",
+                self.outstanding(),
+            )
+        self.block_size = block_size
+        self.window_cap = window_cap
+        self.max_in_flight = max_in_flight
+
+    def summary(self) -> dict[str, int]:
+        return {
+            "budget_bytes": self.budget_bytes,
+            "peak_usage_bytes": self.peak_usage,
+            "resolved_early": self.resolved_early,
+            "truncated": self.truncated,
+        }
+
+    def window(self, max_size: int) -> int:
+        """Ventana efectiva de un candidato bajo el presupuesto actual."""
+        return max_size if self.window_cap is None else min(max_size, self.window_cap)
@@ -0,0 +1,163 @@
+import hashlib
+import logging
+import os
+import stat
+import sys
+from pathlib import Path
+
+
+def is_stream_source(source_path: str) -> bool:
+    """True para stdin (`-`) o una FIFO, orígenes que no admiten mmap ni posicionamiento."""
+    if source_path == "-":
+        return True
+    try:
+        return stat.S_ISFIFO(os.stat(source_path).st_mode)
+    except OSError:
+        return False
+
+
+class StreamSource:
+    """
+    Origen no posicionable (stdin o FIFO) leído secuencialmente a un buffer de ventana deslizante.
+    Expone la interfaz de DiskManager que usa el pipeline (`size`, `get_segment`, `iter_segments`)
+    reteniendo solo los últimos `window_size` bytes más dos bloques, suficiente para validar y
+    hashear cualquier candidato cuya ventana max_size todavía esté pendiente.
+    Opcionalmente escribe una copia de la imagen a medida que los datos pasan.
+    """
+
+    def __init__(self, source_path: str, block_size: int = 4096, window_size: int = 0, copy_path: str | None = None):
+        self.source_path = source_path
+        self.block_size = block_size
+        self.window_size = window_size
+        self.copy_path = copy_path
+        # Bytes recibidos hasta el momento (incluye un bloque de lectura anticipada).
+        self.size = 0
+        self._capacity = window_size + 3 * block_size
+        self._buffer = bytearray(self._capacity)
+        self._head = 0
+        self._stream = None
+        self._copy = None
+        self._eof = False
+        self._hasher = hashlib.sha256()
+
+    def open_device(self):
+        try:
+            self._stream = sys.stdin.buffer if self.source_path == "-" else open(self.source_path, "rb")
+            if self.copy_path:
+                self._copy = open(self.copy_path, "wb")
+            logging.info(f"[Stream] Leyendo en streaming desde {self.source_path} (ventana {self._capacity} bytes)")
+        except Exception as e:
+            logging.error(f"[Stream] Error crítico al abrir el stream: {e}")
+            raise
+
+    def _read_block(self) -> int:
+        """Lee el siguiente bloque del stream; descarta lo que ya salió de la ventana de retención."""
+        if (self.size - self._head) + self.block_size > self._capacity:
+            keep_from = max(self._head, self.size - self.window_size - 2 * self.block_size)
+            used = self.size - keep_from
+            start = keep_from - self._head
+            self._buffer[:used] = self._buffer[start:start + used]
+            self._head = keep_from
+
+        position = self.size - self._head
+        view = memoryview(self._buffer)[position:position + self.block_size]
+        filled = 0
+        while filled < self.block_size:
+            read = self._stream.readinto(view[filled:])
+            if not read:
+                break
+            filled += read
+
+        received = view[:filled]
+        self._hasher.update(received)
+        if self._copy is not None:
+            self._copy.write(received)
+        received.release()
+        view.release()
+
+        self.size += filled
+        if filled < self.block_size:
+            self._mark_eof()
+        return filled
+
+    def _mark_eof(self) -> None:
+        self._eof = True
+        # La copia se cierra al terminar el stream para que su metadata quede estable.
+        if self._copy is not None:
+            self._copy.close()
+            self._copy = None
+            logging.info(f"[Stream] Copia de la imagen escrita en {self.copy_path} ({self.size} bytes)")
+
+    def get_segment(self, start_offset: int, length: int):
+        """Retorna una vista sobre el buffer; el rango debe seguir dentro de la ventana retenida."""
+        if start_offset < self._head:
+            raise ValueError("El rango solicitado ya salió del buffer de streaming")
+        end = min(start_offset + length, self.size)
+        position = start_offset - self._head
+        return memoryview(self._buffer)[position:position + max(0, end - start_offset)]
+
+    def read_exact(self, offset: int, size: int):
+        """Lee exactamente `size` bytes desde `offset` validando límites."""
+        if offset < 0 or size < 0:
+            raise ValueError("offset y size deben ser valores no negativos")
+        if offset + size > self.size:
+            raise ValueError("El rango solicitado excede los datos recibidos")
+        return self.get_segment(offset, size)
+
+    def iter_segments(self, overlap: int = 0, start: int = 0, stop: int | None = None):
+        """
+        Itera segmentos a medida que llegan datos. Mantiene un bloque de lectura anticipada,
+        de modo que `offset + len(segmento) == size` solo ocurre en el último segmento.
+        """
+        if overlap < 0:
+            raise ValueError("overlap debe ser un valor no negativo")
+
+        offset = start
+        while stop is None or offset < stop:
+            if self.block_size - overlap <= 0:
+                raise ValueError("overlap debe ser menor que block_size")
+            while not self._eof and self.size <= offset + self.block_size:
+                self._read_block()
+            if offset >= self.size:
+                break
+            end = self.size if stop is None else min(stop, self.size)
+            length = min(self.block_size, end - offset)
+            segment = self.get_segment(offset, length)
+            yield offset, segment
+            # Un segmento corto solo puede ser el último.
+            if length <= overlap or (offset + length >= end and length < self.block_size):
+                break
+            # El avance usa la longitud entregada: block_size puede cambiar entre segmentos.
+            offset += length - overlap
+
+    def release_range(self, start_offset: int, length: int) -> None:
+        """Sin efecto: la ventana deslizante ya limita la memoria retenida."""
+
+    def get_device_metadata(self) -> dict:
+        """Metadata para cadena de custodia; con copia, identifica la copia (revalidable)."""
+        if self.copy_path and self._eof:
+            stats = os.stat(self.copy_path)
+            source = str(Path(self.copy_path).resolve())
+        elif self._stream is not None:
+            stats = os.fstat(self._stream.fileno())
+            source = self.source_path if self.source_path == "-" else str(Path(self.source_path).resolve())
+        else:
+            stats = os.stat(self.source_path)
+            source = str(Path(self.source_path).resolve())
+        return {
+            "source": source,
+            "size_bytes": self.size,
+            "block_size": self.block_size,
+            "inode": stats.st_ino,
+            "device_id": stats.st_dev,
+            "mtime_epoch": stats.st_mtime,
+            "sha256": self._hasher.hexdigest() if self._eof else None,
+        }
+
+    def close(self):
+        if self._copy is not None:
+            self._copy.close()
+            self._copy = None
+        if self._stream is not None and self._stream is not sys.stdin.buffer:
+            self._stream.close()
+        self._stream = None
@@ -1,3 +1,5 @@
+import bisect
+
 import ahocorasick
 
 
@@ -8,34 +10,81 @@ class DeepCarver:
             ahocorasick.STORE_ANY,
             ahocorasick.KEY_STRING,
         )
+        self.signatures = signatures
+        self.footers: dict[str, bytes] = {}
 
+        # Un mismo patrón puede ser header/footer de varios tipos (ej. EOCD de ZIP y DOCX).
+        patterns: dict[str, list[tuple[str, str, dict]]] = {}
         for name, sig in signatures.items():
             header = sig['header']
 
             if not isinstance(header, (bytes, bytearray)):
                 raise TypeError(f"Header for {name} must be bytes")
 
-            key = header.decode("latin-1")
+            patterns.setdefault(header.decode("latin-1"), []).append(("header", name, sig))
+
+            footer = sig.get('footer')
+            if footer is None:
+                continue
+            if not isinstance(footer, (bytes, bytearray)):
+                raise TypeError(f"Footer for {name} must be bytes")
+
+            self.footers[name] = bytes(footer)
+            patterns.setdefault(footer.decode("latin-1"), []).append(("footer", name, sig))
 
-            self.automaton.add_word(key, (name, sig))
+        for key, entries in patterns.items():
+            self.automaton.add_word(key, (len(key), tuple(entries)))
 
         self.automaton.make_automaton()
+        self.max_pattern_length = max((len(key) for key in patterns), default=0)
 
-    def scan_buffer(self, data: bytes | bytearray | memoryview):
+    def index_buffer(self, data: bytes | bytearray | memoryview) -> tuple[list[dict], dict[str, list[int]]]:
+        """
+        Recorre el buffer una sola vez y retorna headers y footers.
+        Los footers se agrupan por tipo en listas de offsets ordenadas.
+        """
         if not isinstance(data, (bytes, bytearray, memoryview)):
-            raise TypeError("scan_buffer expects a bytes-like object")
+            raise TypeError("index_buffer expects a bytes-like object")
 
         matches = []
+        footers: dict[str, list[int]] = {}
 
         # Mapeo 1:1 de bytes a string para evitar materializar tuplas enormes.
         sequence = bytes(data).decode("latin-1")
 
-        for end_index, (name, sig) in self.automaton.iter(sequence):
-            start_index = end_index - len(sig['header']) + 1
-            matches.append({
-                "type": name,
-                "offset": start_index,
-                "signature": sig
-            })
+        for end_index, (length, entries) in self.automaton.iter(sequence):
+            start_index = end_index - length + 1
+            for kind, name, sig in entries:
+                if kind == "header":
+                    matches.append({
+                        "type": name,
+                        "offset": start_index,
+                        "signature": sig
+                    })
+                else:
+                    footers.setdefault(name, []).append(start_index)
+
+        return matches, footers
 
+    def scan_buffer(self, data: bytes | bytearray | memoryview):
+        matches, _ = self.index_buffer(data)
         return matches
+
+    def find_footer(self, footer_offsets: list[int], file_type: str, start: int, limit: int) -> int | None:
+        """
+        Busca (bisect) el primer footer de `file_type` posterior al header en `start`
+        que termine antes de `limit`. Retorna el offset del footer o None.
+        """
+        footer = self.footers.get(file_type)
+        if footer is None:
+            return None
+
+        first = start + len(self.signatures[file_type]['header'])
+        position = bisect.bisect_left(footer_offsets, first)
+        if position == len(footer_offsets):
+            return None
+
+        footer_offset = footer_offsets[position]
+        if footer_offset + len(footer) > limit:
+            return None
+        return footer_offset
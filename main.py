@@ -1,18 +1,28 @@
 import argparse
+import bisect
 import logging
+from collections import deque
+from typing import Callable, Iterable
 from pathlib import Path
 
 from core.device import DiskManager
+from core.memory import BLOCK_COPY_FACTOR, MemoryGovernor, parse_size
+from core.stream import StreamSource, is_stream_source
+from core.distributed import DEFAULT_LEASE_TTL, DEFAULT_RANGE_SIZE, ScanCoordinator, parse_address, run_worker
 from engines.carver import DeepCarver
 from post_processing.reporter import ForensicReporter
 from ui.dashboard import ForensicDashboard
-from utils.identifiers import FileValidator
+from utils.block_hashes import BlockHashIndex, iter_target_files
+from utils.block_map import SECTOR_SIZE, BlockMap
+from utils.candidate_index import CandidateIndex
+from utils.identifiers import DEFAULT_ENTROPY_THRESHOLD, FileValidator
+from utils.known_hashes import KnownHashSet
 
 DEFAULT_SIGNATURES = {
-    "JPEG": {"header": b"\xff\xd8\xff", "max_size": 4 * 1024 * 1024},
-    "PNG": {"header": b"\x89\x50\x4e\x47", "max_size": 4 * 1024 * 1024},
+    "JPEG": {"header": b"\xff\xd8\xff", "footer": b"\xff\xd9", "max_size": 4 * 1024 * 1024},
+    "PNG": {"header": b"\x89\x50\x4e\x47", "footer": b"IEND", "max_size": 4 * 1024 * 1024},
     "MP4": {"header": b"\x00\x00\x00\x18\x66\x74\x79\x70", "max_size": 8 * 1024 * 1024},
-    "ZIP": {"header": b"\x50\x4b\x03\x04", "max_size": 4 * 1024 * 1024},
+    "ZIP": {"header": b"\x50\x4b\x03\x04", "footer": b"\x50\x4b\x05\x06", "max_size": 4 * 1024 * 1024},
 }
 
 
@@ -22,90 +32,680 @@ def _sample_chunk(device: DiskManager, offset: int, max_size: int) -> memoryview
     return device.get_segment(offset, length)
 
 
-def run_scan(source: str, report_dir: str, block_size: int = 1024 * 1024) -> tuple[int, str, str]:
-    dev = DiskManager(source, block_size=block_size)
+def _bound_candidate(
+    device: DiskManager,
+    carver: DeepCarver,
+    footer_index: dict[str, list[int]],
+    offset: int,
+    file_type: str,
+    window: int,
+) -> tuple[memoryview, int | None] | None:
+    """
+    Delimita un candidato con el índice de footers (bisect, sin búsquedas hacia delante).
+    Retorna (vista acotada, offset absoluto del footer) o None si el tipo exige footer y no lo hay.
+    """
+    sample = _sample_chunk(device, offset, window)
+    if file_type not in carver.footers:
+        return sample, None
+
+    footer_offset = carver.find_footer(footer_index.get(file_type, []), file_type, offset, offset + len(sample))
+    if footer_offset is None:
+        sample.release()
+        return None
+    length = FileValidator.length_from_footer(sample, file_type, footer_offset - offset)
+    if length is None:
+        return sample, footer_offset
+    carved = sample[:length]
+    sample.release()
+    return carved, footer_offset
+
+
+def _accept_candidate(view: memoryview, file_type: str, entropy: float | None, entropy_threshold: float) -> bool:
+    """Valida solo el rango acotado del candidato."""
+    return FileValidator.check_entropy(view, threshold=entropy_threshold, entropy=entropy) and FileValidator.validate_structure(
+        view, file_type
+    )
+
+
+def _add_detection(reporter: ForensicReporter, detections: int, file_type: str, offset: int, carved: memoryview) -> None:
+    reporter.add_entry(
+        filename=f"{file_type}_{detections:04d}",
+        ftype=file_type,
+        size=len(carved),
+        offset=offset,
+        hash_sha256=FileValidator.get_forensic_hash(carved),
+    )
+
+
+def _write_reports(reporter: ForensicReporter, output: Path) -> tuple[str, str]:
+    html_path = str(output / "forensic_report.html")
+    json_path = str(output / "forensic_report.json")
+    csv_path = str(output / "forensic_report.csv")
+    reporter.generate_html(html_path)
+    reporter.export_json(json_path)
+    reporter.export_csv(csv_path)
+    return html_path, json_path
+
+
+def _load_known_hashes(reporter: ForensicReporter, known_hashes: str | None, suppress_known: bool) -> None:
+    """Carga el conjunto de hashes conocidos (mapeado en memoria) y lo registra en el reporter."""
+    if known_hashes is None:
+        return
+    known = KnownHashSet.load(known_hashes)
+    logging.info("[Known] %d hashes conocidos cargados desde %s", len(known), known_hashes)
+    reporter.set_known_hashes(known, suppress=suppress_known)
+
+
+def _memory_governor(
+    memory_budget: int | None,
+    dev: DiskManager | StreamSource,
+    reporter: ForensicReporter,
+    copy_factor: int = BLOCK_COPY_FACTOR,
+) -> MemoryGovernor | None:
+    if memory_budget is None:
+        return None
+    governor = MemoryGovernor(memory_budget, dev.block_size)
+    governor.track("reader", lambda: dev.block_size * copy_factor)
+    governor.track("reporter", reporter.memory_footprint)
+    return governor
+
+
+def _prune_footers(footer_index: dict[str, list[int]], lowest_offset: int) -> None:
+    """Descarta footers que ya no pueden cerrar ningún candidato pendiente."""
+    for offsets in footer_index.values():
+        del offsets[:bisect.bisect_left(offsets, lowest_offset)]
+
+
+def _max_window(signatures: dict, block_size: int) -> int:
+    return max(sig.get("max_size", block_size) for sig in signatures.values())
+
+
+def _case_id(source: str) -> str:
+    return "stdin" if source == "-" else Path(source).stem
+
+
+def _open_source(source: str, block_size: int, image_copy: str | None = None) -> DiskManager | StreamSource:
+    """Elige mmap para imágenes/dispositivos y lectura en streaming para stdin o FIFOs."""
+    if is_stream_source(source):
+        # La ventana retenida debe cubrir el max_size más grande más la cola de solapamiento.
+        window = _max_window(DEFAULT_SIGNATURES, block_size) + max(len(sig["header"]) for sig in DEFAULT_SIGNATURES.values())
+        return StreamSource(source, block_size=block_size, window_size=window, copy_path=image_copy)
+    if image_copy:
+        raise ValueError("--image-copy solo aplica a orígenes en streaming (stdin o FIFO)")
+    return DiskManager(source, block_size=block_size)
+
+
+def _carve_range(
+    dev: DiskManager | StreamSource,
+    carver: DeepCarver,
+    start: int,
+    stop: int | None,
+    entropy_threshold: float,
+    on_detection: Callable[[int, str, memoryview], None],
+    block_map: BlockMap | None = None,
+    candidates: CandidateIndex | None = None,
+    on_block: Callable[[int], None] | None = None,
+    governor: MemoryGovernor | None = None,
+) -> None:
+    """
+    Carving de los headers que comienzan en [start, stop) (hasta el final si stop es None).
+    La lectura continúa tras `stop` hasta cubrir la ventana max_size de los candidatos
+    pendientes para emparejar sus footers.
+    """
+    overlap = carver.max_pattern_length - 1
+    limit = None if stop is None else stop + _max_window(carver.signatures, dev.block_size)
+    previous_tail = b""
+    # Headers y footers se indexan en la misma pasada; un candidato se resuelve
+    # cuando su ventana max_size ya fue escaneada por completo.
+    footer_index: dict[str, list[int]] = {}
+    pending: deque[tuple[int, str, dict]] = deque()
+    classified_until = start
+    released_until = start
+
+    if governor is not None:
+        governor.track("footer_index", lambda: sum(len(offsets) for offsets in footer_index.values()) * 40)
+        governor.track("pending", lambda: len(pending) * 120)
+
+    def candidate_window(signature: dict) -> int:
+        max_size = signature.get("max_size", dev.block_size)
+        return max_size if governor is None else governor.window(max_size)
+
+    def resolve(abs_offset: int, file_type: str, window: int, truncate: bool = False) -> None:
+        if truncate:
+            # El footer aún no fue escaneado: se conserva lo escaneado en lugar de descartar el candidato.
+            bounded = _sample_chunk(dev, abs_offset, window), None
+        else:
+            bounded = _bound_candidate(dev, carver, footer_index, abs_offset, file_type, window)
+            if bounded is None:
+                return
+        carved, footer_offset = bounded
+
+        # Entropía real del rango acotado; se guarda en el índice para --revalidate.
+        entropy = FileValidator.calculate_entropy(carved)
+        if candidates is not None:
+            candidates.add(abs_offset, file_type, len(carved), footer_offset, entropy)
+
+        if _accept_candidate(carved, file_type, entropy, entropy_threshold):
+            on_detection(abs_offset, file_type, carved)
+        carved.release()
+
+    def resolve_early(scanned_until: int) -> None:
+        """
+        Bajo presión de memoria reduce los candidatos en vuelo a `max_in_flight`. Primero resuelve,
+        fuera de orden, los que ya tienen su footer indexado (mismo resultado que con la ventana
+        completa); solo si no alcanza, trunca los más antiguos a lo ya escaneado.
+        """
+        excess = len(pending) - governor.max_in_flight
+        if excess <= 0:
+            return
+        ready: list[tuple[int, str, dict]] = []
+        waiting: list[tuple[int, str, dict]] = []
+        for candidate in pending:
+            abs_offset, file_type, signature = candidate
+            limit = min(abs_offset + candidate_window(signature), scanned_until)
+            footer_offset = carver.find_footer(footer_index.get(file_type, []), file_type, abs_offset, limit)
+            (ready if len(ready) < excess and footer_offset is not None else waiting).append(candidate)
+        pending.clear()
+        pending.extend(waiting)
+
+        for abs_offset, file_type, signature in ready:
+            governor.resolved_early += 1
+            logging.debug("[Memory] %s en %#x resuelto antes de completar su ventana (footer ya indexado)", file_type, abs_offset)
+            resolve(abs_offset, file_type, candidate_window(signature))
+        while len(pending) > governor.max_in_flight:
+            abs_offset, file_type, _signature = pending.popleft()
+            governor.resolved_early += 1
+            governor.truncated += 1
+            logging.warning(
+                "[Memory] %s en %#x truncado a los %d bytes ya escaneados por presión de memoria",
+                file_type,
+                abs_offset,
+                scanned_until - abs_offset,
+            )
+            resolve(abs_offset, file_type, scanned_until - abs_offset, truncate=True)
+
+    def resolve_pending(scanned_until: int | None) -> None:
+        while pending:
+            abs_offset, file_type, signature = pending[0]
+            window = candidate_window(signature)
+            if scanned_until is not None and abs_offset + window > scanned_until:
+                break
+            pending.popleft()
+            resolve(abs_offset, file_type, window)
+        if scanned_until is not None and governor is not None and governor.max_in_flight is not None:
+            resolve_early(scanned_until)
+
+    for offset, chunk in dev.iter_segments(start=start, stop=limit):
+        scan_chunk = b"".join((previous_tail, chunk))
+        base_offset = offset - len(previous_tail)
+        matches, footers = carver.index_buffer(scan_chunk)
+
+        for file_type, relative_offsets in footers.items():
+            offsets = footer_index.setdefault(file_type, [])
+            for relative in relative_offsets:
+                abs_footer = base_offset + relative
+                # Los footers contenidos en la cola solapada ya fueron indexados.
+                if not offsets or abs_footer > offsets[-1]:
+                    offsets.append(abs_footer)
+
+        for match in matches:
+            abs_offset = base_offset + match["offset"]
+            file_type = match["type"]
+            # Un header contenido por completo en la cola solapada ya se detectó en el bloque anterior.
+            if abs_offset + len(match["signature"]["header"]) <= offset:
+                continue
+            if abs_offset < start or (stop is not None and abs_offset >= stop):
+                continue
+            if block_map is not None:
+                block_map.mark_header(abs_offset, file_type)
+            pending.append((abs_offset, file_type, match["signature"]))
+
+        chunk_size = len(chunk)
+        previous_tail = chunk[-overlap:].tobytes() if overlap > 0 else b""
+        chunk.release()
+        scanned = offset + chunk_size
+
+        # Clasificación por sector en la misma pasada (disposición del reporte HTML).
+        if block_map is not None:
+            mapped = scanned if stop is None else min(scanned, stop)
+            classify_end = mapped if mapped == dev.size else mapped - mapped % SECTOR_SIZE
+            if classify_end > classified_until:
+                region = dev.get_segment(classified_until, classify_end - classified_until)
+                block_map.classify(classified_until, region)
+                region.release()
+                classified_until = classify_end
+
+        resolve_pending(scanned)
+        _prune_footers(footer_index, pending[0][0] if pending else scanned - overlap)
+
+        if governor is not None:
+            # Las páginas anteriores al candidato pendiente más antiguo, a la cola y a la
+            # clasificación ya no se leerán: se liberan del RSS antes de medirlo.
+            keep_from = min(pending[0][0] if pending else scanned, scanned - overlap, classified_until if block_map else scanned)
+            if keep_from > released_until:
+                dev.release_range(released_until, keep_from - released_until)
+                released_until = keep_from
+            governor.update()
+            dev.block_size = governor.block_size
+
+        if on_block is not None:
+            on_block(scanned)
+        if stop is not None and scanned >= stop and not pending:
+            break
+
+    resolve_pending(None)
+
+
+def run_scan(
+    source: str,
+    report_dir: str,
+    block_size: int = 1024 * 1024,
+    entropy_threshold: float = DEFAULT_ENTROPY_THRESHOLD,
+    image_copy: str | None = None,
+    memory_budget: int | None = None,
+    known_hashes: str | None = None,
+    suppress_known: bool = False,
+) -> tuple[int, str, str]:
+    dev = _open_source(source, block_size, image_copy)
     carver = DeepCarver(DEFAULT_SIGNATURES)
     dashboard = ForensicDashboard()
+    reporter = ForensicReporter(case_id=_case_id(source), investigator="UltraRecoverPro")
+    _load_known_hashes(reporter, known_hashes, suppress_known)
+    governor = _memory_governor(memory_budget, dev, reporter)
+
+    def record(offset: int, file_type: str, carved: memoryview) -> None:
+        dashboard.update_stats(file_type)
+        _add_detection(reporter, len(reporter.files_recovered) + 1, file_type, offset, carved)
+
+    def render(scanned: int) -> None:
+        progress = scanned / dev.size if dev.size else 1.0
+        dashboard.render_layout(progress, speed=(dev.block_size / (1024 * 1024)))
+
+    output = Path(report_dir)
+    output.mkdir(parents=True, exist_ok=True)
+
+    dev.open_device()
+    try:
+        block_map = BlockMap(output / "block_map.npy", dev.size, DEFAULT_SIGNATURES.keys())
+        candidates = CandidateIndex(output, DEFAULT_SIGNATURES.keys())
+        candidates.create(DEFAULT_SIGNATURES)
+        _carve_range(dev, carver, 0, None, entropy_threshold, record, block_map, candidates, render, governor)
+        if governor is not None:
+            summary = governor.summary()
+            logging.info("[Memory] Resumen del presupuesto: %s", summary)
+            reporter.set_memory_summary(summary)
+        reporter.set_block_layout(block_map.layout())
+        block_map.close()
+        metadata = dev.get_device_metadata()
+        candidates.close(metadata)
+        reporter.set_image_hash(metadata.get("sha256"))
+    finally:
+        dev.close()
+
+    html_path, json_path = _write_reports(reporter, output)
+    return len(reporter.files_recovered), html_path, json_path
+
+
+def scan_range(
+    source: str,
+    start: int,
+    stop: int,
+    block_size: int = 1024 * 1024,
+    entropy_threshold: float = DEFAULT_ENTROPY_THRESHOLD,
+    on_block: Callable[[int], None] | None = None,
+    memory_budget: int | None = None,
+) -> list[dict]:
+    """Escanea los headers de [start, stop) y retorna el fragmento de reporte correspondiente."""
+    dev = DiskManager(source, block_size=block_size)
+    carver = DeepCarver(DEFAULT_SIGNATURES)
     reporter = ForensicReporter(case_id=Path(source).stem, investigator="UltraRecoverPro")
-    overlap = max(len(signature["header"]) for signature in DEFAULT_SIGNATURES.values()) - 1
-    previous_tail = b""
-    seen_offsets: set[tuple[int, str]] = set()
+    governor = _memory_governor(memory_budget, dev, reporter)
+
+    def record(offset: int, file_type: str, carved: memoryview) -> None:
+        _add_detection(reporter, len(reporter.files_recovered) + 1, file_type, offset, carved)
+
+    dev.open_device()
+    try:
+        _carve_range(dev, carver, start, min(stop, dev.size), entropy_threshold, record, on_block=on_block, governor=governor)
+    finally:
+        dev.close()
+    return reporter.files_recovered
+
+
+def revalidate(
+    source: str,
+    report_dir: str,
+    entropy_threshold: float = DEFAULT_ENTROPY_THRESHOLD,
+    known_hashes: str | None = None,
+    suppress_known: bool = False,
+) -> tuple[int, str, str]:
+    """
+    Re-aplica validadores y umbrales sobre el índice de candidatos de un escaneo previo,
+    leyendo solo los rangos de bytes de cada candidato, y regenera los reportes.
+    """
+    output = Path(report_dir)
+    candidates = CandidateIndex.load(output)
+    dev = DiskManager(source)
+    reporter = ForensicReporter(case_id=Path(source).stem, investigator="UltraRecoverPro")
+    _load_known_hashes(reporter, known_hashes, suppress_known)
+    reporter.set_image_hash(candidates.image_sha256)
+
+    dev.open_device()
+    try:
+        candidates.ensure_matches(dev.get_device_metadata(), DEFAULT_SIGNATURES)
+        for offset, file_type, length, _footer, entropy in candidates:
+            carved = dev.get_segment(offset, length)
+            if _accept_candidate(carved, file_type, entropy, entropy_threshold):
+                _add_detection(reporter, len(reporter.files_recovered) + 1, file_type, offset, carved)
+            carved.release()
+    finally:
+        dev.close()
+
+    block_map_path = output / "block_map.npy"
+    if block_map_path.exists():
+        reporter.set_block_layout(BlockMap.load(block_map_path).layout())
+
+    html_path, json_path = _write_reports(reporter, output)
+    return len(reporter.files_recovered), html_path, json_path
+
+
+def run_block_hash_scan(
+    source: str,
+    index_dir: str,
+    report_dir: str,
+    block_size: int = 1024 * 1024,
+    min_run: int = 1,
+    image_copy: str | None = None,
+    memory_budget: int | None = None,
+) -> tuple[int, str, str]:
+    """
+    Modo de hashes por bloque: recorre la imagen en sectores alineados de 4 KiB, los busca en
+    lote en el índice de archivos objetivo y reporta como recuperaciones parciales los tramos de
+    sectores consecutivos que coinciden con bloques consecutivos de un mismo archivo.
+    La memoria depende del bloque de lectura y del índice (mapeado), no del tamaño de la imagen.
+    """
+    index = BlockHashIndex.load(index_dir)
+    # Los segmentos deben empezar en múltiplos de sector para que los sectores queden alineados.
+    dev = _open_source(source, max(SECTOR_SIZE, block_size - block_size % SECTOR_SIZE), image_copy)
+    dashboard = ForensicDashboard()
+    reporter = ForensicReporter(case_id=_case_id(source), investigator="UltraRecoverPro")
+    # Los tamaños de bloque del gobernador están alineados a 4 KiB: los sectores siguen alineados.
+    governor = _memory_governor(memory_budget, dev, reporter, copy_factor=1)
+    # Bloques cubiertos por archivo objetivo (un byte por bloque), para la cobertura total.
+    covered: dict[int, bytearray] = {}
+    # (archivo, bloque esperado en el siguiente sector) -> [sector inicial, bloque inicial, longitud]
+    active: dict[tuple[int, int], list[int]] = {}
+    last_sector = -2
+
+    def close_runs(runs: Iterable[tuple[tuple[int, int], list[int]]]) -> None:
+        for (file_number, _next_block), (first_sector, first_block, length) in runs:
+            if length < min_run:
+                continue
+            target = index.files[file_number]
+            blocks = covered.setdefault(file_number, bytearray(-(-target["size_bytes"] // SECTOR_SIZE)))
+            blocks[first_block:first_block + length] = b"\x01" * length
+            reporter.add_partial_recovery(
+                target["name"],
+                first_sector * SECTOR_SIZE,
+                length * SECTOR_SIZE,
+                first_block * SECTOR_SIZE,
+                length / max(1, target["indexed_blocks"]),
+            )
+
+    output = Path(report_dir)
+    output.mkdir(parents=True, exist_ok=True)
 
-    detections = 0
     dev.open_device()
     try:
-        for offset in range(0, dev.size, dev.block_size):
-            chunk = dev.get_segment(offset, min(dev.block_size, dev.size - offset))
-            scan_chunk = previous_tail + chunk.tobytes()
-            base_offset = offset - len(previous_tail)
-            matches = carver.scan_buffer(scan_chunk)
-
-            for match in matches:
-                abs_offset = base_offset + match["offset"]
-                signature = match["signature"]
-                file_type = match["type"]
-                fingerprint = (abs_offset, file_type)
-                if fingerprint in seen_offsets:
-                    continue
-                seen_offsets.add(fingerprint)
-                sample = _sample_chunk(dev, abs_offset, signature.get("max_size", dev.block_size))
-
-                if not FileValidator.check_entropy(sample):
-                    sample.release()
-                    continue
-                if not FileValidator.validate_structure(sample, file_type):
-                    sample.release()
-                    continue
-
-                carved = FileValidator.trim_to_structure(sample, file_type)
-
-                detections += 1
-                dashboard.update_stats(file_type)
-                reporter.add_entry(
-                    filename=f"{file_type}_{detections:04d}",
-                    ftype=file_type,
-                    size=len(carved),
-                    offset=abs_offset,
-                    hash_sha256=FileValidator.get_forensic_hash(carved),
-                )
-                if carved is not sample:
-                    carved.release()
-                sample.release()
-
-            chunk_size = len(chunk)
-            previous_tail = chunk[-overlap:].tobytes() if overlap > 0 else b""
-            chunk.release()
-            progress = (offset + chunk_size) / dev.size if dev.size else 1.0
+        for offset, segment in dev.iter_segments():
+            base_sector = offset // SECTOR_SIZE
+            for relative, matches in index.lookup(segment, len(segment) // SECTOR_SIZE):
+                sector = base_sector + relative
+                if sector != last_sector + 1:
+                    close_runs(active.items())
+                    active = {}
+                extended: dict[tuple[int, int], list[int]] = {}
+                for file_number, block in matches:
+                    run = active.pop((file_number, block), None) or [sector, block, 0]
+                    run[2] += 1
+                    extended[(file_number, block + 1)] = run
+                # Los tramos que no continúan en este sector terminan en el anterior.
+                close_runs(active.items())
+                active = extended
+                last_sector = sector
+            scanned = offset + len(segment)
+            segment.release()
+            if governor is not None:
+                # Un segmento ya buscado no se vuelve a leer.
+                dev.release_range(offset, scanned - offset)
+                governor.update()
+                dev.block_size = governor.block_size
+            progress = scanned / dev.size if dev.size else 1.0
             dashboard.render_layout(progress, speed=(dev.block_size / (1024 * 1024)))
+        close_runs(active.items())
+        reporter.set_image_hash(dev.get_device_metadata().get("sha256"))
+        if governor is not None:
+            reporter.set_memory_summary(governor.summary())
+    finally:
+        dev.close()
+        index.close()
+
+    reporter.set_target_coverage(
+        {
+            index.files[file_number]["name"]: blocks.count(1) / max(1, index.files[file_number]["indexed_blocks"])
+            for file_number, blocks in covered.items()
+        }
+    )
+    html_path, json_path = _write_reports(reporter, output)
+    return len(reporter.partial_recoveries), html_path, json_path
+
+
+def _image_size(source: str) -> int:
+    dev = DiskManager(source)
+    dev.open_device()
+    try:
+        return dev.size
     finally:
         dev.close()
 
+
+def run_coordinator(
+    source: str,
+    report_dir: str,
+    address: tuple[str, int],
+    range_size: int = DEFAULT_RANGE_SIZE,
+    lease_ttl: float = DEFAULT_LEASE_TTL,
+    timeout: float | None = None,
+    on_ready: Callable[[tuple[str, int]], None] | None = None,
+    known_hashes: str | None = None,
+    suppress_known: bool = False,
+) -> tuple[int, str, str]:
+    """Arrienda rangos de la imagen a workers remotos y fusiona sus fragmentos en un único reporte."""
+    coordinator = ScanCoordinator(_image_size(source), range_size, lease_ttl, *address)
+    logging.info("[Coordinator] Escuchando en %s:%d (%d rangos)", *coordinator.address, len(coordinator.ranges))
+    if on_ready is not None:
+        on_ready(coordinator.address)
+    fragments = coordinator.serve_until_complete(timeout)
+
+    reporter = ForensicReporter(case_id=Path(source).stem, investigator="UltraRecoverPro")
+    _load_known_hashes(reporter, known_hashes, suppress_known)
+    reporter.merge_fragments(fragments)
     output = Path(report_dir)
     output.mkdir(parents=True, exist_ok=True)
-    html_path = str(output / "forensic_report.html")
-    json_path = str(output / "forensic_report.json")
-    csv_path = str(output / "forensic_report.csv")
-    reporter.generate_html(html_path)
-    reporter.export_json(json_path)
-    reporter.export_csv(csv_path)
-    return detections, html_path, json_path
+    html_path, json_path = _write_reports(reporter, output)
+    return len(reporter.files_recovered), html_path, json_path
+
+
+def run_scan_worker(
+    source: str,
+    address: tuple[str, int],
+    block_size: int = 1024 * 1024,
+    entropy_threshold: float = DEFAULT_ENTROPY_THRESHOLD,
+    memory_budget: int | None = None,
+) -> int:
+    """Worker de escaneo distribuido: `source` es la ruta de la imagen visible desde este host."""
+
+    def scan(start: int, stop: int, heartbeat: Callable[[], None]) -> list[dict]:
+        return scan_range(
+            source, start, stop, block_size, entropy_threshold, on_block=lambda _scanned: heartbeat(), memory_budget=memory_budget
+        )
+
+    return run_worker(address, scan, image_size=_image_size(source))
 
 
 def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="UltraRecoverPro forensic scanner")
-    parser.add_argument("source", help="Ruta al disco o imagen forense")
+    parser.add_argument("source", help="Ruta al disco o imagen forense ('-' para leer desde stdin)")
+    parser.add_argument(
+        "--image-copy",
+        help="Con origen en streaming (stdin '-' o FIFO), escribe una copia de la imagen mientras se analiza",
+    )
     parser.add_argument("--report-dir", default="reports", help="Directorio de reportes de salida")
     parser.add_argument("--block-size", type=int, default=1024 * 1024, help="Tamaño de bloque en bytes")
+    parser.add_argument(
+        "--entropy-threshold",
+        type=float,
+        default=DEFAULT_ENTROPY_THRESHOLD,
+        help="Entropía mínima (bits/byte) para aceptar un candidato",
+    )
+    parser.add_argument(
+        "--revalidate",
+        action="store_true",
+        help="Re-valida el índice de candidatos de --report-dir sin re-escanear la imagen",
+    )
+    parser.add_argument("--coordinator", metavar="HOST:PUERTO", help="Coordina un escaneo distribuido en esta dirección")
+    parser.add_argument("--worker", metavar="HOST:PUERTO", help="Procesa rangos arrendados por el coordinador indicado")
+    parser.add_argument(
+        "--range-size",
+        type=int,
+        default=DEFAULT_RANGE_SIZE,
+        help="Tamaño en bytes de cada rango arrendado (modo coordinador)",
+    )
+    parser.add_argument(
+        "--lease-ttl",
+        type=float,
+        default=DEFAULT_LEASE_TTL,
+        help="Segundos sin heartbeat tras los que un rango se re-emite (modo coordinador)",
+    )
+    parser.add_argument(
+        "--memory-budget",
+        type=parse_size,
+        help="Memoria máxima del escaneo (ej. 2G, 512M); adapta bloque, ventanas y candidatos en vuelo",
+    )
+    parser.add_argument(
+        "--known-hashes",
+        metavar="DIR",
+        help="Conjunto de SHA-256 conocidos (creado con --build-known-hashes); marca esas detecciones",
+    )
+    parser.add_argument(
+        "--suppress-known",
+        action="store_true",
+        help="Omite de los reportes las detecciones con hash conocido en lugar de marcarlas",
+    )
+    parser.add_argument(
+        "--build-known-hashes",
+        metavar="DIR",
+        help="Construye en DIR el conjunto de hashes conocidos desde la lista de texto indicada en source",
+    )
+    parser.add_argument(
+        "--block-hashes",
+        metavar="DIR",
+        help="Busca en la imagen los bloques de 4 KiB de los archivos objetivo indexados en DIR",
+    )
+    parser.add_argument(
+        "--build-block-hashes",
+        metavar="DIR",
+        help="Construye en DIR el índice de hashes por bloque del archivo o directorio indicado en source",
+    )
+    parser.add_argument(
+        "--min-run",
+        type=int,
+        default=1,
+        help="Bloques consecutivos mínimos para reportar una recuperación parcial (modo --block-hashes)",
+    )
     parser.add_argument("--log-level", default="INFO", help="Nivel de logging")
     return parser
 
 
+def _reject_ignored_options(parser: argparse.ArgumentParser, args: argparse.Namespace) -> None:
+    """Rechaza opciones que el modo elegido ignoraría en silencio."""
+    if args.build_block_hashes or args.build_known_hashes:
+        return
+    if args.worker:
+        mode, ignored = "--worker", {"--image-copy": args.image_copy, "--known-hashes": args.known_hashes}
+    elif args.block_hashes:
+        mode, ignored = "--block-hashes", {"--known-hashes": args.known_hashes}
+    elif args.coordinator:
+        mode, ignored = "--coordinator", {"--image-copy": args.image_copy, "--memory-budget": args.memory_budget}
+    elif args.revalidate:
+        mode, ignored = "--revalidate", {"--image-copy": args.image_copy, "--memory-budget": args.memory_budget}
+    else:
+        return
+    for option, value in ignored.items():
+        if value is not None:
+            parser.error(f"{option} no aplica con {mode}")
+
+
 def main() -> None:
     parser = build_parser()
     args = parser.parse_args()
 
     logging.basicConfig(level=getattr(logging, args.log_level.upper(), logging.INFO))
-    detections, html_path, json_path = run_scan(args.source, args.report_dir, args.block_size)
+    if args.suppress_known and not args.known_hashes:
+        parser.error("--suppress-known requiere --known-hashes")
+    _reject_ignored_options(parser, args)
+    if args.build_block_hashes:
+        index = BlockHashIndex.build(iter_target_files(args.source), args.build_block_hashes)
+        print(f"Bloques indexados: {index.count} de {len(index.files)} archivos en {args.build_block_hashes}")
+        return
+
+    if args.build_known_hashes:
+        known = KnownHashSet.build([args.source], args.build_known_hashes)
+        print(f"Hashes conocidos indexados: {len(known)} en {args.build_known_hashes}")
+        return
+
+    if args.worker:
+        completed = run_scan_worker(
+            args.source, parse_address(args.worker), args.block_size, args.entropy_threshold, args.memory_budget
+        )
+        print(f"Worker finalizado. Rangos procesados: {completed}")
+        return
+
+    if args.block_hashes:
+        detections, html_path, json_path = run_block_hash_scan(
+            args.source,
+            args.block_hashes,
+            args.report_dir,
+            args.block_size,
+            args.min_run,
+            args.image_copy,
+            args.memory_budget,
+        )
+    elif args.coordinator:
+        detections, html_path, json_path = run_coordinator(
+            args.source,
+            args.report_dir,
+            parse_address(args.coordinator),
+            args.range_size,
+            args.lease_ttl,
+            known_hashes=args.known_hashes,
+            suppress_known=args.suppress_known,
+        )
+    elif args.revalidate:
+        detections, html_path, json_path = revalidate(
+            args.source, args.report_dir, args.entropy_threshold, args.known_hashes, args.suppress_known
+        )
+    else:
+        detections, html_path, json_path = run_scan(
+            args.source,
+            args.report_dir,
+            args.block_size,
+            args.entropy_threshold,
+            args.image_copy,
+            args.memory_budget,
+            args.known_hashes,
+            args.suppress_known,
+        )
     print(f"Análisis completado. Detecciones válidas: {detections}")
     print(f"Reporte HTML: {html_path}")
     print(f"Reporte JSON: {json_path}")
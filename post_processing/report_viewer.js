@@ -0,0 +1,182 @@
+// Tabla virtualizada del reporte: las detecciones llegan en shards JSON comprimidos (gzip + base64)
+// que se cargan bajo demanda; solo se renderizan en el DOM las filas visibles.
+(function () {
+    const manifest = URP.manifest;
+    const shell = document.getElementById('tableShell');
+    const body = document.getElementById('detectionRows');
+    const status = document.getElementById('tableStatus');
+    const typeFilter = document.getElementById('filterType');
+    const offsetMin = document.getElementById('filterOffsetMin');
+    const offsetMax = document.getElementById('filterOffsetMax');
+    if (!shell || !body || manifest.total === 0 || typeof DecompressionStream === 'undefined') {
+        return;
+    }
+
+    const OVERSCAN = 20;
+    let rowHeight = 0;
+    let filtered = null;
+    let filterToken = 0;
+
+    manifest.types.forEach((type) => {
+        const option = document.createElement('option');
+        option.value = type;
+        option.textContent = type;
+        typeFilter.appendChild(option);
+    });
+    document.getElementById('tableFilters').hidden = false;
+    const pageNote = document.getElementById('pageNote');
+    if (pageNote) {
+        pageNote.remove();
+    }
+    shell.classList.add('virtual');
+
+    function rowAt(index, missing) {
+        if (filtered !== null) {
+            return filtered[index];
+        }
+        const shardIndex = Math.floor(index / manifest.shard_size);
+        const shard = URP.rows[shardIndex];
+        if (!shard) {
+            missing.add(shardIndex);
+            return null;
+        }
+        return shard[index % manifest.shard_size];
+    }
+
+    function cell(label, text, className) {
+        const td = document.createElement('td');
+        td.dataset.label = label;
+        td.textContent = text;
+        if (className) {
+            td.className = className;
+        }
+        return td;
+    }
+
+    function spacer(height) {
+        const tr = document.createElement('tr');
+        tr.className = 'spacer';
+        tr.style.height = `${height}px`;
+        return tr;
+    }
+
+    function render() {
+        const total = filtered !== null ? filtered.length : manifest.total;
+        if (!rowHeight) {
+            const sample = body.querySelector('tr:not(.spacer)');
+            rowHeight = sample ? sample.getBoundingClientRect().height || 44 : 44;
+        }
+        const first = Math.max(0, Math.floor(shell.scrollTop / rowHeight) - OVERSCAN);
+        const visible = Math.ceil(shell.clientHeight / rowHeight) + 2 * OVERSCAN;
+        const last = Math.min(total, first + visible);
+
+        const missing = new Set();
+        const fragment = document.createDocumentFragment();
+        fragment.appendChild(spacer(first * rowHeight));
+        for (let index = first; index < last; index += 1) {
+            const row = rowAt(index, missing);
+            const tr = document.createElement('tr');
+            if (row === null || row === undefined) {
+                tr.appendChild(cell('Nombre/ID', 'Cargando…'));
+                tr.firstChild.colSpan = 5;
+            } else {
+                tr.appendChild(cell('Nombre/ID', row[0]));
+                tr.appendChild(cell('Tipo', row[1]));
+                tr.appendChild(cell('Tamaño', `${Number(row[2]).toFixed(2)} KB`));
+                tr.appendChild(cell('Offset (Hex)', row[3]));
+                tr.appendChild(cell('Hash SHA-256', row[4], 'hash'));
+                if (row[5]) {
+                    tr.className = 'known';
+                }
+            }
+            fragment.appendChild(tr);
+        }
+        fragment.appendChild(spacer((total - last) * rowHeight));
+        body.replaceChildren(fragment);
+        missing.forEach((shardIndex) => loadShard(shardIndex).then(render));
+    }
+
+    function parseOffset(value) {
+        const text = value.trim();
+        if (text === '') {
+            return null;
+        }
+        const parsed = text.toLowerCase().startsWith('0x') ? parseInt(text, 16) : parseInt(text, 10);
+        return Number.isNaN(parsed) ? null : parsed;
+    }
+
+    async function applyFilters() {
+        const type = typeFilter.value;
+        const min = parseOffset(offsetMin.value);
+        const max = parseOffset(offsetMax.value);
+        const token = ++filterToken;
+        shell.scrollTop = 0;
+
+        if (type === '' && min === null && max === null) {
+            filtered = null;
+            status.textContent = `${manifest.total} detecciones`;
+            render();
+            return;
+        }
+
+        // El manifiesto (tipos y rango de offsets por shard) evita descargar shards sin coincidencias.
+        const candidates = manifest.shards
+            .map((shard, index) => ({ shard, index }))
+            .filter(({ shard }) => (type === '' || shard.types[type])
+                && (min === null || shard.max >= min)
+                && (max === null || shard.min <= max));
+        filtered = [];
+        for (let position = 0; position < candidates.length; position += 1) {
+            const rows = await loadShard(candidates[position].index);
+            if (token !== filterToken) {
+                return;
+            }
+            rows.forEach((row) => {
+                const offset = parseInt(row[3], 16);
+                if ((type === '' || row[1] === type)
+                    && (min === null || offset >= min)
+                    && (max === null || offset <= max)) {
+                    filtered.push(row);
+                }
+            });
+            status.textContent = `${filtered.length} coincidencias (${position + 1}/${candidates.length} bloques cargados)`;
+            render();
+        }
+        status.textContent = `${filtered.length} coincidencias`;
+        render();
+    }
+
+    function loadShard(index) {
+        if (URP.rows[index]) {
+            return Promise.resolve(URP.rows[index]);
+        }
+        if (!URP.pending[index]) {
+            URP.pending[index] = new Promise((resolve) => {
+                URP.waiting[index] = resolve;
+                const script = document.createElement('script');
+                script.src = manifest.shards[index].file;
+                script.onerror = () => {
+                    status.textContent = `No se pudo cargar ${manifest.shards[index].file}`;
+                };
+                document.body.appendChild(script);
+            });
+        }
+        return URP.pending[index];
+    }
+
+    let scheduled = false;
+    shell.addEventListener('scroll', () => {
+        if (!scheduled) {
+            scheduled = true;
+            requestAnimationFrame(() => {
+                scheduled = false;
+                render();
+            });
+        }
+    });
+    [typeFilter, offsetMin, offsetMax].forEach((input) => input.addEventListener('change', applyFilters));
+
+    status.textContent = `${manifest.total} detecciones`;
+    Promise.all(Object.values(URP.pending)).then(render);
+    render();
+})();
@@ -1,9 +1,24 @@
+import base64
 import datetime
 import csv
+import gzip
 import html
+import itertools
 import json
+import shutil
 from pathlib import Path
-from typing import Any
+from typing import Any, Container, Iterable
+
+
+HTML_PAGE_ROWS = 100
+HTML_SHARD_ROWS = 5000
+# Estimación por entrada: dict de 6 claves más nombre, offset y hash como str.
+ENTRY_FOOTPRINT_BYTES = 800
+
+
+def _script_json(value: Any) -> str:
+    """JSON seguro para incrustar dentro de <script> (evita cerrar la etiqueta con datos no confiables)."""
+    return json.dumps(value, ensure_ascii=False).replace("<", "\\u003c")
 
 
 class ForensicReporter:
@@ -14,20 +29,77 @@ class ForensicReporter:
         self.investigator = investigator
         self.files_recovered: list[dict[str, Any]] = []
         self.start_time = datetime.datetime.now()
+        self.block_layout: list[int] = []
+        self.known_hashes: Container[str] | None = None
+        self.suppress_known = False
+        self.known_suppressed = 0
+        self.partial_recoveries: list[dict[str, Any]] = []
+        self.target_coverage: dict[str, float] = {}
+        self.image_sha256: str | None = None
+        self.memory_summary: dict[str, int] | None = None
+
+    def set_known_hashes(self, known_hashes: Container[str], suppress: bool = False) -> None:
+        """
+        Registra un conjunto de hashes conocidos (ej. `KnownHashSet`). Las entradas cuyo hash
+        pertenece al conjunto se marcan con `known` o, con `suppress`, se omiten de los reportes.
+        """
+        self.known_hashes = known_hashes
+        self.suppress_known = suppress
+
+    def _tag_known(self, entry: dict[str, Any]) -> bool:
+        """
+        Marca la entrada; retorna False si debe omitirse por ser un archivo conocido.
+        Sin conjunto de hashes conocidos la entrada no se modifica (el esquema de JSON/CSV no cambia).
+        """
+        if self.known_hashes is None:
+            return True
+        entry["known"] = entry["hash"] in self.known_hashes
+        if entry["known"] and self.suppress_known:
+            self.known_suppressed += 1
+            return False
+        return True
+
+    def set_image_hash(self, sha256: str | None) -> None:
+        """SHA-256 de la imagen adquirida en streaming; queda en el JSON como evidencia de custodia."""
+        self.image_sha256 = sha256
+
+    def set_memory_summary(self, summary: dict[str, int]) -> None:
+        """Resumen de `MemoryGovernor` (escaneo con --memory-budget): candidatos resueltos antes o truncados."""
+        self.memory_summary = dict(summary)
 
     def add_entry(self, filename: str, ftype: str, size: int, offset: int, hash_sha256: str) -> None:
         """Añade un registro de archivo recuperado al informe."""
-        self.files_recovered.append(
+        entry = {
+            "name": filename,
+            "type": ftype,
+            "size_bytes": size,
+            "size_kb": round(size / 1024, 2),
+            "offset": hex(offset),
+            "hash": hash_sha256,
+        }
+        if self._tag_known(entry):
+            self.files_recovered.append(entry)
+
+    def add_partial_recovery(self, target: str, offset: int, size: int, file_offset: int, coverage: float) -> None:
+        """
+        Registra un tramo de la imagen que coincide bloque a bloque con un archivo objetivo
+        (índice de hashes por bloque). `coverage` es la fracción del archivo cubierta por el tramo.
+        """
+        self.partial_recoveries.append(
             {
-                "name": filename,
-                "type": ftype,
+                "name": f"PARTIAL_{len(self.partial_recoveries) + 1:04d}",
+                "target": target,
                 "size_bytes": size,
-                "size_kb": round(size / 1024, 2),
                 "offset": hex(offset),
-                "hash": hash_sha256,
+                "file_offset": hex(file_offset),
+                "coverage_pct": round(coverage * 100, 2),
             }
         )
 
+    def set_target_coverage(self, coverage: dict[str, float]) -> None:
+        """Cobertura total (0-1) por archivo objetivo, contando cada bloque una sola vez."""
+        self.target_coverage = {target: round(value * 100, 2) for target, value in coverage.items()}
+
     def add_batch_entries(self, entries: list[dict[str, Any]]) -> None:
         """Ingiere múltiples entradas en una sola operación."""
         for entry in entries:
@@ -39,6 +111,31 @@ class ForensicReporter:
                 hash_sha256=str(entry["hash_sha256"]),
             )
 
+    def merge_fragments(self, fragments: Iterable[list[dict[str, Any]]]) -> None:
+        """
+        Fusiona fragmentos de reporte (ej. uno por rango de un escaneo distribuido),
+        descartando duplicados por (offset, tipo) y ordenando por offset.
+        Los nombres se renumeran porque cada fragmento usa su propio contador.
+        """
+        merged: dict[tuple[int, str], dict[str, Any]] = {}
+        for entry in itertools.chain(self.files_recovered, *fragments):
+            merged.setdefault((int(entry["offset"], 16), entry["type"]), entry)
+        # Los fragmentos de workers no conocen el conjunto de hashes del coordinador.
+        merged = {key: entry for key, entry in merged.items() if self._tag_known(entry)}
+
+        self.files_recovered = [
+            {**entry, "name": f"{entry['type']}_{position:04d}"}
+            for position, (_, entry) in enumerate(sorted(merged.items(), key=lambda item: item[0]), start=1)
+        ]
+
+    def memory_footprint(self) -> int:
+        """Estimación en bytes de la memoria retenida por las entradas acumuladas."""
+        return (len(self.files_recovered) + len(self.partial_recoveries)) * ENTRY_FOOTPRINT_BYTES
+
+    def set_block_layout(self, cells: list[int]) -> None:
+        """Registra la disposición reducida de la imagen (códigos `LAYOUT_*` de `BlockMap`)."""
+        self.block_layout = list(cells)
+
     def _generate_stats(self) -> dict[str, int]:
         stats: dict[str, int] = {}
         for recovered in self.files_recovered:
@@ -48,11 +145,15 @@ class ForensicReporter:
 
     def _generate_integrity_summary(self) -> dict[str, int]:
         hashes = [item["hash"] for item in self.files_recovered]
-        return {
+        summary = {
             "hashes_total": len(hashes),
             "hashes_unicos": len(set(hashes)),
             "hashes_duplicados": len(hashes) - len(set(hashes)),
         }
+        if self.known_hashes is not None:
+            summary["conocidos"] = sum(1 for item in self.files_recovered if item.get("known"))
+            summary["conocidos_omitidos"] = self.known_suppressed
+        return summary
 
     def _bytes_recovered(self) -> int:
         return sum(item["size_bytes"] for item in self.files_recovered)
@@ -66,24 +167,100 @@ class ForensicReporter:
             value /= 1024
         return f"{value:.2f} GB"
 
-    def _rows_html(self) -> str:
+    def _rows_html(self, items: list[dict[str, Any]]) -> str:
         return "".join(
             [
                 (
-                    "<tr><td data-label='Nombre/ID'>{name}</td><td data-label='Tipo'>{type}</td>"
+                    "<tr{known}><td data-label='Nombre/ID'>{name}</td><td data-label='Tipo'>{type}</td>"
                     "<td data-label='Tamaño'>{size}</td><td data-label='Offset (Hex)'>{offset}</td>"
                     "<td data-label='Hash SHA-256' class='hash'>{hash}</td></tr>"
                 ).format(
+                    known=" class='known'" if item.get("known") else "",
                     name=html.escape(item["name"]),
                     type=html.escape(item["type"]),
                     size=f"{item['size_kb']:.2f} KB",
                     offset=html.escape(item["offset"]),
                     hash=html.escape(item["hash"]),
                 )
-                for item in self.files_recovered
+                for item in items
             ]
         )
 
+    def _partial_section_html(self) -> str:
+        """Tabla de recuperaciones parciales (solo la primera página; el detalle completo va en el JSON)."""
+        if not self.partial_recoveries:
+            return ""
+        rows = "".join(
+            (
+                "<tr><td data-label='Nombre/ID'>{name}</td><td data-label='Archivo objetivo'>{target}</td>"
+                "<td data-label='Tamaño'>{size}</td><td data-label='Offset (Hex)'>{offset}</td>"
+                "<td data-label='Offset en archivo'>{file_offset}</td><td data-label='Cobertura'>{coverage:.2f} %</td></tr>"
+            ).format(
+                name=html.escape(item["name"]),
+                target=html.escape(item["target"]),
+                size=self._human_size(item["size_bytes"]),
+                offset=html.escape(item["offset"]),
+                file_offset=html.escape(item["file_offset"]),
+                coverage=item["coverage_pct"],
+            )
+            for item in self.partial_recoveries[:HTML_PAGE_ROWS]
+        )
+        remaining = len(self.partial_recoveries) - HTML_PAGE_ROWS
+        note = f"<p class='note'>{remaining} tramos más en el reporte JSON.</p>" if remaining > 0 else ""
+        return (
+            "<h2>Recuperaciones parciales</h2><div class='table-shell'><table><thead><tr>"
+            "<th>Nombre/ID</th><th>Archivo objetivo</th><th>Tamaño</th><th>Offset (Hex)</th>"
+            "<th>Offset en archivo</th><th>Cobertura</th></tr></thead>"
+            f"<tbody>{rows}</tbody></table></div>{note}"
+        )
+
+    def _write_shards(self, output_path: Path) -> tuple[dict[str, Any], str]:
+        """
+        Escribe las detecciones en shards JSON comprimidos (gzip + base64) de HTML_SHARD_ROWS filas.
+        Si caben en un único shard se incrustan en el HTML; si no, van a `<reporte>_shards/`
+        y el navegador los carga bajo demanda. Retorna (manifiesto, scripts de shards incrustados).
+        Los shards de una generación anterior se eliminan siempre, para no dejar datos huérfanos.
+        """
+        total = len(self.files_recovered)
+        external = total > HTML_SHARD_ROWS
+        shard_dir = output_path.with_name(f"{output_path.stem}_shards")
+        if shard_dir.is_dir():
+            shutil.rmtree(shard_dir)
+        if external:
+            shard_dir.mkdir(parents=True, exist_ok=True)
+
+        manifest: dict[str, Any] = {
+            "total": total,
+            "shard_size": HTML_SHARD_ROWS,
+            "types": sorted({item["type"] for item in self.files_recovered}),
+            "shards": [],
+        }
+        inline_scripts = []
+        for index, start in enumerate(range(0, total, HTML_SHARD_ROWS)):
+            items = self.files_recovered[start:start + HTML_SHARD_ROWS]
+            rows = [
+                [item["name"], item["type"], item["size_kb"], item["offset"], item["hash"], int(bool(item.get("known")))]
+                for item in items
+            ]
+            payload = base64.b64encode(gzip.compress(json.dumps(rows, ensure_ascii=False).encode("utf-8"))).decode("ascii")
+            call = f'URP.shard({index}, "{payload}");'
+
+            offsets = [int(item["offset"], 16) for item in items]
+            types: dict[str, int] = {}
+            for item in items:
+                types[item["type"]] = types.get(item["type"], 0) + 1
+            shard: dict[str, Any] = {"count": len(items), "min": min(offsets), "max": max(offsets), "types": types}
+
+            if external:
+                shard_path = shard_dir / f"shard_{index:05d}.js"
+                shard_path.write_text(call + "\n", encoding="ascii")
+                shard["file"] = f"{shard_dir.name}/{shard_path.name}"
+            else:
+                inline_scripts.append(f"<script>{call}</script>")
+            manifest["shards"].append(shard)
+
+        return manifest, "\n".join(inline_scripts)
+
     def export_json(self, output_path: str) -> None:
         payload = {
             "case_id": self.case_id,
@@ -92,19 +269,26 @@ class ForensicReporter:
             "totals": {
                 "files": len(self.files_recovered),
                 "by_type": self._generate_stats(),
+                "partial_recoveries": len(self.partial_recoveries),
             },
             "integrity": self._generate_integrity_summary(),
             "files": self.files_recovered,
+            "partial_recoveries": self.partial_recoveries,
+            "target_coverage_pct": self.target_coverage,
         }
+        if self.image_sha256 is not None:
+            payload["image_sha256"] = self.image_sha256
+        if self.memory_summary is not None:
+            payload["memory_budget"] = self.memory_summary
         Path(output_path).write_text(json.dumps(payload, indent=2, ensure_ascii=False), encoding="utf-8")
 
     def export_csv(self, output_path: str) -> None:
         """Exporta resultados tabulares para SIEM/BI o auditorías externas."""
         with Path(output_path).open("w", encoding="utf-8", newline="") as csv_file:
-            writer = csv.DictWriter(
-                csv_file,
-                fieldnames=["name", "type", "size_bytes", "size_kb", "offset", "hash"],
-            )
+            fieldnames = ["name", "type", "size_bytes", "size_kb", "offset", "hash"]
+            if self.known_hashes is not None:
+                fieldnames.append("known")
+            writer = csv.DictWriter(csv_file, fieldnames=fieldnames)
             writer.writeheader()
             writer.writerows(self.files_recovered)
 
@@ -117,7 +301,27 @@ class ForensicReporter:
 
         escaped_case_id = html.escape(self.case_id)
         escaped_investigator = html.escape(self.investigator)
-        rows = self._rows_html() or "<tr><td colspan='5'>No se detectaron archivos válidos.</td></tr>"
+        # Solo la primera página va como HTML; el resto se entrega en shards a la tabla virtualizada.
+        rows = (
+            self._rows_html(self.files_recovered[:HTML_PAGE_ROWS])
+            or "<tr><td colspan='5'>No se detectaron archivos válidos.</td></tr>"
+        )
+        manifest, inline_shards = self._write_shards(Path(output_path))
+        # Sin JavaScript o sin DecompressionStream solo queda la primera página; el visor retira el aviso.
+        remaining = len(self.files_recovered) - HTML_PAGE_ROWS
+        page_note = (
+            f"<p class='note' id='pageNote'>{remaining} detecciones más; abra el reporte en un navegador "
+            "compatible o use el JSON/CSV.</p>"
+            if remaining > 0
+            else ""
+        )
+        viewer_script = Path(__file__).with_name("report_viewer.js").read_text(encoding="utf-8")
+        known_card = ""
+        if self.known_hashes is not None:
+            known_card = "<div class=\"card\"><h3>{count}</h3><p>Archivos conocidos ({action})</p></div>".format(
+                count=integrity["conocidos_omitidos"] if self.suppress_known else integrity["conocidos"],
+                action="omitidos" if self.suppress_known else "marcados",
+            )
 
         rendered_html = html_template.format(
             case_id=escaped_case_id,
@@ -128,9 +332,16 @@ class ForensicReporter:
             hash_total=integrity["hashes_total"],
             hash_unique=integrity["hashes_unicos"],
             hash_duplicates=integrity["hashes_duplicados"],
+            known_card=known_card,
             rows=rows,
             chart_labels=json.dumps([html.escape(label) for label in stats.keys()], ensure_ascii=False),
             chart_data=json.dumps(list(stats.values())),
+            layout_data=json.dumps(self.block_layout),
+            manifest=_script_json(manifest),
+            inline_shards=inline_shards,
+            viewer_script=viewer_script,
+            partial_section=self._partial_section_html(),
+            page_note=page_note,
         )
 
         Path(output_path).write_text(rendered_html, encoding="utf-8")
@@ -0,0 +1,94 @@
+import hashlib
+import json
+import os
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import pytest
+
+from main import run_block_hash_scan
+from utils.block_hashes import SECTOR_SIZE, BlockHashIndex, iter_target_files
+
+
+def test_build_skips_repetitive_blocks_and_confirms_matches(tmp_path: Path) -> None:
+    targets = tmp_path / "targets"
+    targets.mkdir()
+    document = bytes(2 * SECTOR_SIZE) + os.urandom(6 * SECTOR_SIZE) + b"\xaa" * SECTOR_SIZE + b"tail"
+    (targets / "document.bin").write_bytes(document)
+    (targets / "photo.bin").write_bytes(os.urandom(3 * SECTOR_SIZE))
+
+    index = BlockHashIndex.build(iter_target_files(targets), tmp_path / "index")
+    assert index.count == 9
+    assert [item["indexed_blocks"] for item in index.files] == [6, 3]
+
+    loaded = BlockHashIndex.load(tmp_path / "index")
+    data = os.urandom(SECTOR_SIZE) + document[3 * SECTOR_SIZE:5 * SECTOR_SIZE] + bytes(SECTOR_SIZE)
+    assert list(loaded.lookup(data, 4)) == [(1, [(0, 3)]), (2, [(0, 4)])]
+
+
+def test_load_requires_built_index(tmp_path: Path) -> None:
+    with pytest.raises(FileNotFoundError):
+        BlockHashIndex.load(tmp_path)
+
+
+def test_block_hash_scan_reports_fragment_runs_with_coverage(tmp_path: Path) -> None:
+    target = tmp_path / "contract.docx"
+    content = os.urandom(10 * SECTOR_SIZE)
+    target.write_bytes(content)
+    BlockHashIndex.build([target], tmp_path / "index")
+
+    # El archivo aparece fragmentado y sin header: bloques 6-9 antes que 2-4; los bloques 0-1 y 5 faltan.
+    image = bytearray(os.urandom(512 * 1024))
+    image[16 * SECTOR_SIZE:20 * SECTOR_SIZE] = content[6 * SECTOR_SIZE:10 * SECTOR_SIZE]
+    image[63 * SECTOR_SIZE:66 * SECTOR_SIZE] = content[2 * SECTOR_SIZE:5 * SECTOR_SIZE]
+    evidence = tmp_path / "fragments.img"
+    evidence.write_bytes(image)
+
+    runs, html_report, json_report = run_block_hash_scan(
+        str(evidence), str(tmp_path / "index"), str(tmp_path / "reports"), block_size=64 * SECTOR_SIZE
+    )
+
+    assert runs == 2
+    data = json.loads(Path(json_report).read_text(encoding="utf-8"))
+    found = [(item["offset"], item["file_offset"], item["size_bytes"], item["coverage_pct"]) for item in data["partial_recoveries"]]
+    assert found == [
+        (hex(16 * SECTOR_SIZE), hex(6 * SECTOR_SIZE), 4 * SECTOR_SIZE, 40.0),
+        (hex(63 * SECTOR_SIZE), hex(2 * SECTOR_SIZE), 3 * SECTOR_SIZE, 30.0),
+    ]
+    assert data["target_coverage_pct"] == {str(target): 70.0}
+    assert "Recuperaciones parciales" in Path(html_report).read_text(encoding="utf-8")
+
+    strict, _, _ = run_block_hash_scan(
+        str(evidence), str(tmp_path / "index"), str(tmp_path / "strict"), block_size=64 * SECTOR_SIZE, min_run=4
+    )
+    assert strict == 1
+
+
+def test_block_hash_scan_from_stream_with_copy_and_memory_budget(tmp_path: Path) -> None:
+    target = tmp_path / "ledger.xlsx"
+    content = os.urandom(8 * SECTOR_SIZE)
+    target.write_bytes(content)
+    BlockHashIndex.build([target], tmp_path / "index")
+
+    image = bytearray(os.urandom(1024 * 1024))
+    # Tras el primer bloque el presupuesto reduce la lectura a 64 KiB; el tramo cruza el límite en 320 KiB.
+    image[76 * SECTOR_SIZE:84 * SECTOR_SIZE] = content
+    fifo = tmp_path / "acquisition.fifo"
+    os.mkfifo(fifo)
+    writer = threading.Thread(target=lambda: fifo.write_bytes(bytes(image)))
+    writer.start()
+    copy = tmp_path / "copy.img"
+    runs, _, json_report = run_block_hash_scan(
+        str(fifo), str(tmp_path / "index"), str(tmp_path / "reports"), 256 * 1024, image_copy=str(copy), memory_budget=1
+    )
+    writer.join()
+
+    assert runs == 1
+    data = json.loads(Path(json_report).read_text(encoding="utf-8"))
+    assert data["target_coverage_pct"] == {str(target): 100.0}
+    assert copy.read_bytes() == bytes(image)
+    assert data["image_sha256"] == hashlib.sha256(image).hexdigest()
+    assert data["memory_budget"]["budget_bytes"] == 1
@@ -0,0 +1,43 @@
+import json
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import numpy as np
+
+from utils.block_map import ENTROPY_SCALE, FLAG_ZERO, LAYOUT_HEADER, LAYOUT_HIGH, LAYOUT_ZERO, SECTOR_SIZE, BlockMap
+from utils.identifiers import FileValidator
+
+
+def test_classify_computes_entropy_and_zero_flags(tmp_path: Path) -> None:
+    random_sector = os.urandom(SECTOR_SIZE)
+    data = bytes(SECTOR_SIZE) + random_sector + b"A" * 100
+
+    block_map = BlockMap(tmp_path / "block_map.npy", len(data), ["JPEG", "PNG"])
+    block_map.classify(0, data)
+    block_map.mark_header(SECTOR_SIZE + 10, "PNG")
+
+    assert list(block_map.sectors["flags"]) == [FLAG_ZERO, 0, 0]
+    expected = FileValidator.calculate_entropy(random_sector)
+    assert abs(block_map.sectors["entropy"][1] / ENTROPY_SCALE - expected) < 0.05
+    assert block_map.sectors["entropy"][2] == 0
+    assert block_map.layout() == [LAYOUT_ZERO, LAYOUT_HEADER, 1]
+    block_map.close()
+
+    stored = np.load(tmp_path / "block_map.npy", mmap_mode="r")
+    assert stored["headers"][1] == 0b10
+    sidecar = json.loads((tmp_path / "block_map.json").read_text(encoding="utf-8"))
+    assert sidecar["header_types"] == ["JPEG", "PNG"]
+    assert sidecar["sectors"] == 3
+
+
+def test_layout_downsamples_to_requested_cells(tmp_path: Path) -> None:
+    data = os.urandom(64 * SECTOR_SIZE)
+    block_map = BlockMap(tmp_path / "block_map.npy", len(data), [])
+    block_map.classify(0, data)
+
+    assert block_map.layout(cells=8) == [LAYOUT_HIGH] * 8
+    block_map.close()
+
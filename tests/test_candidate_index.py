@@ -0,0 +1,58 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import pytest
+
+from utils.candidate_index import CandidateIndex, signature_fingerprint
+
+SIGNATURES = {"JPEG": {"header": b"\xff\xd8\xff", "footer": b"\xff\xd9", "max_size": 1024}}
+METADATA = {"source": "/evidence.img", "size_bytes": 10, "block_size": 4, "inode": 1, "device_id": 2, "mtime_epoch": 3.0}
+
+
+def test_candidate_index_roundtrip(tmp_path: Path) -> None:
+    index = CandidateIndex(tmp_path, ["JPEG", "ZIP"])
+    index.create(SIGNATURES)
+    index.add(16, "ZIP", 100, None, None)
+    index.add(4096, "JPEG", 2048, 6142, 7.5)
+    index.close(METADATA)
+
+    loaded = CandidateIndex.load(tmp_path)
+    assert loaded.count == 2
+    assert list(loaded) == [(16, "ZIP", 100, None, None), (4096, "JPEG", 2048, 6142, 7.5)]
+    loaded.ensure_matches({**METADATA, "block_size": 512}, SIGNATURES)
+
+
+def test_candidate_index_rejects_other_image_or_signatures(tmp_path: Path) -> None:
+    index = CandidateIndex(tmp_path, ["JPEG"])
+    index.create(SIGNATURES)
+    index.close(METADATA)
+    loaded = CandidateIndex.load(tmp_path)
+
+    with pytest.raises(ValueError):
+        loaded.ensure_matches({**METADATA, "mtime_epoch": 4.0}, SIGNATURES)
+
+    changed = {"JPEG": {**SIGNATURES["JPEG"], "max_size": 2048}}
+    assert signature_fingerprint(changed) != signature_fingerprint(SIGNATURES)
+    with pytest.raises(ValueError):
+        loaded.ensure_matches(METADATA, changed)
+
+
+def test_load_requires_existing_index(tmp_path: Path) -> None:
+    with pytest.raises(FileNotFoundError):
+        CandidateIndex.load(tmp_path)
+
+
+def test_interrupted_rescan_leaves_no_loadable_index(tmp_path: Path) -> None:
+    index = CandidateIndex(tmp_path, ["JPEG"])
+    index.create(SIGNATURES)
+    index.add(4096, "JPEG", 2048, 6142, 7.5)
+    index.close(METADATA)
+
+    # Un nuevo escaneo sobre el mismo directorio que no llega a close().
+    rescan = CandidateIndex(tmp_path, ["JPEG"])
+    rescan.create(SIGNATURES)
+
+    with pytest.raises(FileNotFoundError):
+        CandidateIndex.load(tmp_path)
@@ -0,0 +1,35 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from engines.carver import DeepCarver
+
+SIGNATURES = {
+    "JPEG": {"header": b"\xff\xd8\xff", "footer": b"\xff\xd9", "max_size": 64},
+    "ZIP": {"header": b"PK\x03\x04", "footer": b"PK\x05\x06", "max_size": 64},
+    "DOCX": {"header": b"PK\x03\x04\x14\x00\x06\x00", "footer": b"PK\x05\x06", "max_size": 64},
+}
+
+
+def test_index_buffer_returns_headers_and_sorted_footers() -> None:
+    carver = DeepCarver(SIGNATURES)
+    data = b"xx\xff\xd8\xffAAA\xff\xd9--\xff\xd9PK\x03\x04..PK\x05\x06"
+
+    matches, footers = carver.index_buffer(data)
+
+    assert [(m["type"], m["offset"]) for m in matches] == [("JPEG", 2), ("ZIP", 14)]
+    assert footers["JPEG"] == [8, 12]
+    # Un footer compartido se indexa para todos los tipos que lo declaran.
+    assert footers["ZIP"] == footers["DOCX"] == [20]
+    assert carver.scan_buffer(data) == matches
+
+
+def test_find_footer_uses_first_footer_inside_window() -> None:
+    carver = DeepCarver(SIGNATURES)
+    offsets = [1, 8, 12, 200]
+
+    assert carver.find_footer(offsets, "JPEG", 2, 66) == 8
+    assert carver.find_footer(offsets, "JPEG", 9, 73) == 12
+    assert carver.find_footer(offsets, "JPEG", 13, 77) is None
+    assert carver.find_footer(offsets, "JPEG", 198, 201) is None
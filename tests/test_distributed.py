@@ -0,0 +1,200 @@
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import pytest
+
+import core.distributed as distributed
+from core.distributed import ScanCoordinator, parse_address, run_worker, send_message
+from main import run_coordinator, run_scan, run_scan_worker
+
+
+def _write_evidence(path: Path, starts: list[int]) -> None:
+    # Relleno sin headers JPEG accidentales para que el número de detecciones sea determinista.
+    payload = bytearray(os.urandom(1024 * 1024).replace(b"\xff\xd8", b"\x00\x00"))
+    for start in starts:
+        jpeg = b"\xff\xd8\xff" + os.urandom(4096).replace(b"\xff\xd9", b"\x00\x00") + b"\xff\xd9"
+        payload[start : start + len(jpeg)] = jpeg
+    path.write_bytes(payload)
+
+
+def test_parse_address() -> None:
+    assert parse_address("10.0.0.5:7000") == ("10.0.0.5", 7000)
+    with pytest.raises(ValueError):
+        parse_address("localhost")
+
+
+def test_coordinator_reissues_expired_lease() -> None:
+    coordinator = ScanCoordinator(image_size=300, range_size=100, lease_ttl=0.2)
+    scanned: list[tuple[int, int]] = []
+
+    def scan(start: int, stop: int, heartbeat) -> list[dict]:
+        scanned.append((start, stop))
+        return [{"name": "x", "type": "JPEG", "size_bytes": 1, "size_kb": 0.0, "offset": hex(start), "hash": "h"}]
+
+    # Un worker que desaparece tras arrendar el primer rango.
+    abandoned = coordinator.handle_message({"op": "lease", "worker": "lost"})
+    assert abandoned["start"] == 0
+    time.sleep(0.3)
+
+    worker = threading.Thread(target=run_worker, args=(coordinator.address, scan), daemon=True)
+    worker.start()
+    fragments = coordinator.serve_until_complete(timeout=10)
+    worker.join(timeout=10)
+
+    assert sorted(scanned) == [(0, 100), (100, 200), (200, 300)]
+    assert [fragment[0]["offset"] for fragment in fragments] == ["0x0", "0x64", "0xc8"]
+
+
+def test_coordinator_rejects_complete_without_matching_lease() -> None:
+    coordinator = ScanCoordinator(image_size=200, range_size=100)
+    entry = {"name": "x", "type": "JPEG", "size_bytes": 1, "size_kb": 0.0, "offset": "0x0", "hash": "h"}
+    lease = coordinator.handle_message({"op": "lease", "worker": "a"})
+
+    with pytest.raises(ValueError):
+        coordinator.handle_message({"op": "complete", "lease": "bogus", "range": 1, "entries": [entry]})
+    with pytest.raises(ValueError):
+        coordinator.handle_message({"op": "complete", "lease": lease["lease"], "range": 1, "entries": [entry]})
+    assert coordinator.handle_message({"op": "complete", "lease": lease["lease"], "range": 0, "entries": [entry]}) == {"ok": True}
+
+    server = threading.Thread(target=coordinator.server.serve_forever, daemon=True)
+    server.start()
+    try:
+        assert "error" in send_message(coordinator.address, ["no", "es", "un", "dict"])
+        assert "error" in send_message(coordinator.address, {"op": "complete", "lease": "bogus", "range": 1, "entries": []})
+    finally:
+        coordinator.server.shutdown()
+        coordinator.server.server_close()
+        server.join()
+
+
+def test_worker_abandons_range_when_renew_is_refused() -> None:
+    coordinator = ScanCoordinator(image_size=100, range_size=100, lease_ttl=0.3)
+    calls: list[int] = []
+    lost: list[bool] = []
+
+    def scan(start: int, stop: int, heartbeat) -> list[dict]:
+        calls.append(start)
+        if len(calls) == 1:
+            # El lease vence durante el escaneo; la renovación se rechaza y el rango se re-arrienda.
+            time.sleep(0.4)
+            try:
+                heartbeat()
+            except distributed.LeaseLost:
+                lost.append(True)
+                raise
+        return [{"name": "x", "type": "JPEG", "size_bytes": 1, "size_kb": 0.0, "offset": hex(start), "hash": "h"}]
+
+    worker = threading.Thread(target=run_worker, args=(coordinator.address, scan), daemon=True)
+    worker.start()
+    fragments = coordinator.serve_until_complete(timeout=10)
+    worker.join(timeout=10)
+
+    assert lost == [True]
+    assert calls == [0, 0]
+    assert fragments == [[{"name": "x", "type": "JPEG", "size_bytes": 1, "size_kb": 0.0, "offset": "0x0", "hash": "h"}]]
+
+
+def test_worker_retries_connection_failures_and_reports_unreachable_coordinator(monkeypatch) -> None:
+    monkeypatch.setattr(distributed, "RETRY_DELAYS", (0.01, 0.01))
+    real_send = distributed.send_message
+    failures = [ConnectionResetError("blip")]
+
+    def flaky_send(address, message):
+        if failures:
+            raise failures.pop()
+        return real_send(address, message)
+
+    monkeypatch.setattr(distributed, "send_message", flaky_send)
+    coordinator = ScanCoordinator(image_size=100, range_size=100)
+    worker_result: list[int] = []
+    worker = threading.Thread(
+        target=lambda: worker_result.append(run_worker(coordinator.address, lambda start, stop, heartbeat: [])),
+        daemon=True,
+    )
+    worker.start()
+    coordinator.serve_until_complete(timeout=10)
+    worker.join(timeout=10)
+    assert worker_result == [1]
+
+    # Con el coordinador cerrado el worker falla en lugar de dar el trabajo por terminado.
+    with pytest.raises(OSError):
+        run_worker(coordinator.address, lambda start, stop, heartbeat: [])
+
+
+def test_drain_does_not_wait_for_a_dead_workers_duplicate_lease() -> None:
+    coordinator = ScanCoordinator(image_size=100, range_size=100, lease_ttl=60)
+    coordinator.poll_interval = 0.05
+    stalled = coordinator.handle_message({"op": "lease", "worker": "lento"})
+    # El lease del worker lento vence y el rango se re-emite a un worker que luego cae.
+    coordinator._leases[stalled["lease"]] = (0, 0.0)
+    duplicate = coordinator.handle_message({"op": "lease", "worker": "caido"})
+    assert duplicate["range"] == 0
+    coordinator.handle_message({"op": "complete", "lease": stalled["lease"], "range": 0, "entries": []})
+
+    started = time.monotonic()
+    assert coordinator.serve_until_complete(timeout=5) == [[]]
+    assert time.monotonic() - started < (distributed.DRAIN_POLLS + 2) * coordinator.poll_interval + 1
+
+
+def test_worker_treats_closed_coordinator_as_finished_after_completing(monkeypatch) -> None:
+    monkeypatch.setattr(distributed, "RETRY_DELAYS", (0.01,))
+    replies = [
+        {"lease": "l1", "range": 0, "start": 0, "stop": 100, "size": 100, "ttl": 60},
+        {"ok": True},
+    ]
+
+    def send(address, message):
+        if replies:
+            return replies.pop(0)
+        raise ConnectionRefusedError("coordinador cerrado")
+
+    monkeypatch.setattr(distributed, "send_message", send)
+    assert run_worker(("127.0.0.1", 9), lambda start, stop, heartbeat: []) == 1
+
+
+def test_distributed_scan_matches_single_host(tmp_path: Path) -> None:
+    evidence = tmp_path / "shared.img"
+    # El segundo JPEG cruza la frontera entre rangos de 256 KiB.
+    _write_evidence(evidence, [1000, 256 * 1024 - 100, 700 * 1024])
+
+    _, _, local_json = run_scan(str(evidence), str(tmp_path / "local"), block_size=64 * 1024)
+    expected = json.loads(Path(local_json).read_text(encoding="utf-8"))["files"]
+
+    ready = threading.Event()
+    address: list[tuple[str, int]] = []
+    result: list[tuple[int, str, str]] = []
+
+    def coordinate() -> None:
+        result.append(
+            run_coordinator(
+                str(evidence),
+                str(tmp_path / "distributed"),
+                ("127.0.0.1", 0),
+                range_size=256 * 1024,
+                timeout=30,
+                on_ready=lambda bound: (address.append(bound), ready.set()),
+            )
+        )
+
+    coordinator = threading.Thread(target=coordinate)
+    coordinator.start()
+    assert ready.wait(10)
+    workers = [
+        threading.Thread(target=run_scan_worker, args=(str(evidence), address[0], 64 * 1024)) for _ in range(2)
+    ]
+    for worker in workers:
+        worker.start()
+    coordinator.join(30)
+    for worker in workers:
+        worker.join(30)
+
+    detections, _, json_report = result[0]
+    files = json.loads(Path(json_report).read_text(encoding="utf-8"))["files"]
+    assert detections == len(expected) == 3
+    assert files == expected
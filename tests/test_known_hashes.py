@@ -0,0 +1,47 @@
+import hashlib
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import pytest
+
+from utils.known_hashes import KnownHashSet
+
+
+def _digests(prefix: str, count: int) -> list[str]:
+    return [hashlib.sha256(f"{prefix}{index}".encode()).hexdigest() for index in range(count)]
+
+
+def test_build_merges_runs_and_answers_membership(tmp_path: Path) -> None:
+    known = _digests("known", 1000)
+    first = tmp_path / "nsrl.txt"
+    first.write_text("SHA-256,FileName\n" + "\n".join(f"{digest}  file_{i}.dll" for i, digest in enumerate(known[:700])))
+    second = tmp_path / "vendor.txt"
+    second.write_text("\n".join(known[500:]).upper() + "\n")
+
+    hash_set = KnownHashSet.build([first, second], tmp_path / "known", run_digests=128)
+    assert len(hash_set) == 1000
+    data = hash_set.hashes_path.read_bytes()
+    records = [data[position:position + 32] for position in range(0, len(data), 32)]
+    assert records == sorted(records)
+    assert not (tmp_path / "known" / "runs").exists()
+
+    loaded = KnownHashSet.load(tmp_path / "known")
+    assert all(digest in loaded for digest in known)
+    assert not any(digest in loaded for digest in _digests("unknown", 1000))
+    assert "no-es-un-hash" not in loaded
+
+
+def test_load_requires_built_set(tmp_path: Path) -> None:
+    with pytest.raises(FileNotFoundError):
+        KnownHashSet.load(tmp_path)
+
+
+def test_empty_set_contains_nothing(tmp_path: Path) -> None:
+    hash_list = tmp_path / "empty.txt"
+    hash_list.write_text("")
+
+    hash_set = KnownHashSet.build([hash_list], tmp_path / "known")
+    assert len(hash_set) == 0
+    assert hashlib.sha256(b"x").hexdigest() not in hash_set
@@ -0,0 +1,49 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import pytest
+
+from core.memory import MIN_BLOCK_SIZE, MIN_WINDOW_SIZE, MemoryGovernor, parse_size
+
+
+def test_parse_size_accepts_units() -> None:
+    assert parse_size("2G") == 2 * 1024 ** 3
+    assert parse_size("512m") == 512 * 1024 ** 2
+    assert parse_size("64KB") == 64 * 1024
+    assert parse_size("1048576") == 1048576
+    with pytest.raises(ValueError):
+        parse_size("muchos")
+    with pytest.raises(ValueError):
+        parse_size("0")
+
+
+def test_governor_shrinks_limits_as_usage_grows() -> None:
+    usage = [0]
+    governor = MemoryGovernor(64 * 1024 ** 2, block_size=4 * 1024 ** 2, rss_reader=lambda: usage[0])
+    governor.track("reporter", lambda: 1234)
+
+    governor.update()
+    assert governor.block_size == 4 * 1024 ** 2
+    assert governor.max_in_flight is None
+    assert governor.window(1024 ** 3) == 8 * 1024 ** 2
+
+    usage[0] = 48 * 1024 ** 2
+    governor.update()
+    assert governor.block_size == 2 * 1024 ** 2
+    assert governor.max_in_flight == 1024
+
+    usage[0] = 64 * 1024 ** 2 - 256 * 1024
+    governor.update()
+    assert governor.block_size == MIN_BLOCK_SIZE
+    assert governor.window(1024 ** 3) == MIN_WINDOW_SIZE
+    assert governor.window(1000) == 1000
+    assert governor.max_in_flight == 64
+    assert governor.peak_usage == 64 * 1024 ** 2 - 256 * 1024
+    assert governor.outstanding() == {"reporter": 1234}
+
+    usage[0] = 0
+    governor.update()
+    assert governor.block_size == 4 * 1024 ** 2
+    assert governor.max_in_flight is None
@@ -1,12 +1,18 @@
 import json
+import logging
 import os
 import sys
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
-from main import run_scan
+import numpy as np
+import pytest
+
+from main import main, revalidate, run_scan, scan_range
+from utils.candidate_index import CandidateIndex
 from utils.identifiers import FileValidator
+from utils.known_hashes import KnownHashSet
 
 
 def test_run_scan_generates_reports(tmp_path: Path) -> None:
@@ -91,3 +97,223 @@ def test_run_scan_trims_jpeg_until_eoi(tmp_path: Path) -> None:
     first = data["files"][0]
     assert first["type"] == "JPEG"
     assert first["size_bytes"] < 10000
+
+
+def test_run_scan_pairs_footer_found_in_later_block(tmp_path: Path) -> None:
+    evidence = tmp_path / "spanning.img"
+    payload = bytearray(os.urandom(1024 * 1024))
+
+    start = 1000
+    body = os.urandom(300 * 1024).replace(b"\xff\xd9", b"\x00\x00")
+    jpeg = b"\xff\xd8\xff" + body + b"\xff\xd9"
+    payload[start : start + len(jpeg)] = jpeg
+    evidence.write_bytes(payload)
+
+    detections, _, json_report = run_scan(str(evidence), str(tmp_path / "reports"), block_size=64 * 1024)
+
+    assert detections >= 1
+    data = json.loads(Path(json_report).read_text(encoding="utf-8"))
+    first = data["files"][0]
+    assert first["offset"] == hex(start)
+    assert first["size_bytes"] == len(jpeg)
+
+
+def test_run_scan_writes_block_map_next_to_reports(tmp_path: Path) -> None:
+    evidence = tmp_path / "map.img"
+    payload = bytearray(os.urandom(256 * 1024))
+    payload[: 64 * 1024] = bytes(64 * 1024)
+    evidence.write_bytes(payload)
+
+    run_scan(str(evidence), str(tmp_path / "reports"), block_size=100 * 1000)
+
+    block_map = np.load(tmp_path / "reports" / "block_map.npy", mmap_mode="r")
+    assert len(block_map) == 64
+    assert all(block_map["flags"][:16] == 1)
+    assert not any(block_map["flags"][16:])
+
+
+def test_revalidate_reapplies_threshold_from_candidate_index(tmp_path: Path) -> None:
+    evidence = tmp_path / "revalidate.img"
+    payload = bytearray(os.urandom(512 * 1024))
+
+    start = 8192
+    jpeg = b"\xff\xd8\xff" + os.urandom(2048).replace(b"\xff\xd9", b"\x00\x00") + b"\xff\xd9"
+    payload[start : start + len(jpeg)] = jpeg
+    evidence.write_bytes(payload)
+    reports = tmp_path / "reports"
+
+    detections, _, _ = run_scan(str(evidence), str(reports), block_size=128 * 1024)
+    assert detections >= 1
+    assert (reports / "candidates.bin").exists()
+
+    relaxed, _, json_report = revalidate(str(evidence), str(reports))
+    assert relaxed == detections
+    data = json.loads(Path(json_report).read_text(encoding="utf-8"))
+    assert any(item["offset"] == hex(start) and item["size_bytes"] == len(jpeg) for item in data["files"])
+
+    strict, _, _ = revalidate(str(evidence), str(reports), entropy_threshold=8.0)
+    assert strict == 0
+
+
+def test_run_scan_under_memory_pressure_keeps_detections(tmp_path: Path) -> None:
+    evidence = tmp_path / "budget.img"
+    payload = bytearray(os.urandom(1024 * 1024).replace(b"\xff\xd8", b"\x00\x00"))
+
+    offsets = [1000, 200 * 1024 - 1, 300 * 1024 + 7, 700 * 1024]
+    for start in offsets:
+        body = os.urandom(40 * 1024).replace(b"\xff\xd9", b"\x00\x00").replace(b"\xff\xd8", b"\x00\x00")
+        jpeg = b"\xff\xd8\xff" + body + b"\xff\xd9"
+        payload[start : start + len(jpeg)] = jpeg
+    evidence.write_bytes(payload)
+
+    _, _, baseline_report = run_scan(str(evidence), str(tmp_path / "baseline"), block_size=256 * 1024)
+    # Un presupuesto mínimo fuerza bloque, ventana y candidatos en vuelo a sus límites inferiores.
+    _, _, budget_report = run_scan(str(evidence), str(tmp_path / "budget"), block_size=256 * 1024, memory_budget=1)
+
+    def found(report: str) -> set[tuple[str, int]]:
+        data = json.loads(Path(report).read_text(encoding="utf-8"))
+        return {(item["offset"], item["size_bytes"]) for item in data["files"]}
+
+    assert found(budget_report) == found(baseline_report)
+    assert {offset for offset, _ in found(budget_report)} >= {hex(start) for start in offsets}
+
+
+def _png(size: int) -> bytes:
+    body = os.urandom(size)
+    for marker in (b"\xff\xd8", b"\xff\xd9", b"\x89PNG", b"IEND"):
+        body = body.replace(marker, b"\x00" * len(marker))
+    return b"\x89PNG\r\n\x1a\n" + body + b"IEND" + bytes(4)
+
+
+def test_memory_pressure_keeps_candidates_whose_footer_lies_past_the_scanned_window(tmp_path: Path) -> None:
+    evidence = tmp_path / "far_footer.img"
+    payload = bytearray(os.urandom(1024 * 1024))
+    for marker in (b"\xff\xd8", b"\xff\xd9", b"\x89PNG", b"IEND"):
+        payload = payload.replace(marker, b"\x00" * len(marker))
+    # JPEG de 200 KiB en 0 (su EOI queda más allá del primer bloque) y 80 PNG pequeños dentro de él.
+    payload[:4] = b"\xff\xd8\xff\xe0"
+    payload[200 * 1024 : 200 * 1024 + 2] = b"\xff\xd9"
+    for index in range(80):
+        png = _png(400)
+        start = 1024 + index * 700
+        payload[start : start + len(png)] = png
+    evidence.write_bytes(payload)
+
+    _, _, baseline_report = run_scan(str(evidence), str(tmp_path / "baseline"), block_size=64 * 1024)
+    _, _, budget_report = run_scan(str(evidence), str(tmp_path / "budget"), block_size=64 * 1024, memory_budget=1)
+
+    baseline = json.loads(Path(baseline_report).read_text(encoding="utf-8"))
+    budget = json.loads(Path(budget_report).read_text(encoding="utf-8"))
+    assert len(baseline["files"]) == 81
+    assert {(item["offset"], item["hash"]) for item in budget["files"]} == {
+        (item["offset"], item["hash"]) for item in baseline["files"]
+    }
+    # Los PNG se resuelven antes, con su footer ya indexado; el JPEG espera su EOI sin truncarse.
+    assert budget["memory_budget"]["resolved_early"] > 0
+    assert budget["memory_budget"]["truncated"] == 0
+    assert "memory_budget" not in baseline
+
+
+def test_memory_pressure_truncates_and_counts_when_no_footer_is_indexed(tmp_path: Path, caplog) -> None:
+    evidence = tmp_path / "crowded.img"
+    payload = bytearray(os.urandom(1024 * 1024))
+    for marker in (b"\xff\xd8", b"\xff\xd9", b"\x89PNG", b"IEND"):
+        payload = payload.replace(marker, b"\x00" * len(marker))
+    # 70 headers JPEG en el primer bloque comparten un EOI lejano: más que los 64 candidatos en vuelo.
+    for index in range(70):
+        payload[index * 512 : index * 512 + 4] = b"\xff\xd8\xff\xe0"
+    payload[150 * 1024 : 150 * 1024 + 2] = b"\xff\xd9"
+    evidence.write_bytes(payload)
+
+    with caplog.at_level(logging.WARNING):
+        _, _, budget_report = run_scan(str(evidence), str(tmp_path / "budget"), block_size=64 * 1024, memory_budget=1)
+
+    summary = json.loads(Path(budget_report).read_text(encoding="utf-8"))["memory_budget"]
+    truncations = [record for record in caplog.records if "truncado" in record.getMessage()]
+    assert summary["truncated"] == len(truncations) == 6
+    assert summary["resolved_early"] >= summary["truncated"]
+    # Los candidatos truncados quedan en el índice con la longitud escaneada, no se descartan.
+    index = CandidateIndex.load(tmp_path / "budget")
+    assert index.count == 70
+
+
+def test_scan_range_with_memory_budget_matches_unbounded_scan(tmp_path: Path) -> None:
+    evidence = tmp_path / "worker.img"
+    payload = bytearray(os.urandom(1024 * 1024).replace(b"\xff\xd8", b"\x00\x00"))
+    for start in (1000, 300 * 1024, 600 * 1024):
+        jpeg = b"\xff\xd8\xff" + os.urandom(8192).replace(b"\xff\xd9", b"\x00\x00") + b"\xff\xd9"
+        payload[start : start + len(jpeg)] = jpeg
+    evidence.write_bytes(payload)
+
+    unbounded = scan_range(str(evidence), 0, 512 * 1024, block_size=64 * 1024)
+    bounded = scan_range(str(evidence), 0, 512 * 1024, block_size=64 * 1024, memory_budget=1)
+    assert [item["offset"] for item in bounded] == [item["offset"] for item in unbounded] == [hex(1000), hex(300 * 1024)]
+    assert bounded == unbounded
+
+
+def test_run_scan_suppresses_known_files(tmp_path: Path) -> None:
+    evidence = tmp_path / "known.img"
+    payload = bytearray(os.urandom(512 * 1024).replace(b"\xff\xd8", b"\x00\x00"))
+
+    jpegs = []
+    for start in (4096, 200 * 1024):
+        jpeg = b"\xff\xd8\xff" + os.urandom(2048).replace(b"\xff\xd9", b"\x00\x00") + b"\xff\xd9"
+        payload[start : start + len(jpeg)] = jpeg
+        jpegs.append(jpeg)
+    evidence.write_bytes(payload)
+
+    hash_list = tmp_path / "known.txt"
+    hash_list.write_text(FileValidator.get_forensic_hash(jpegs[0]) + "  system.jpg\n")
+    KnownHashSet.build([hash_list], tmp_path / "known")
+
+    _, _, tagged_report = run_scan(str(evidence), str(tmp_path / "tagged"), 128 * 1024, known_hashes=str(tmp_path / "known"))
+    tagged = json.loads(Path(tagged_report).read_text(encoding="utf-8"))
+    assert {item["offset"]: item["known"] for item in tagged["files"]} == {hex(4096): True, hex(200 * 1024): False}
+
+    detections, _, suppressed_report = run_scan(
+        str(evidence), str(tmp_path / "suppressed"), 128 * 1024, known_hashes=str(tmp_path / "known"), suppress_known=True
+    )
+    suppressed = json.loads(Path(suppressed_report).read_text(encoding="utf-8"))
+    assert detections == 1
+    assert [item["offset"] for item in suppressed["files"]] == [hex(200 * 1024)]
+    assert suppressed["integrity"]["conocidos_omitidos"] == 1
+
+
+@pytest.mark.parametrize(
+    ("options", "message"),
+    [
+        (["--suppress-known"], "--suppress-known requiere --known-hashes"),
+        (["--revalidate", "--memory-budget", "1G"], "--memory-budget no aplica con --revalidate"),
+        (["--revalidate", "--image-copy", "copia.img"], "--image-copy no aplica con --revalidate"),
+        (["--coordinator", "127.0.0.1:0", "--memory-budget", "1G"], "--memory-budget no aplica con --coordinator"),
+        (["--worker", "127.0.0.1:0", "--image-copy", "copia.img"], "--image-copy no aplica con --worker"),
+        (["--block-hashes", "indice", "--known-hashes", "conocidos"], "--known-hashes no aplica con --block-hashes"),
+    ],
+)
+def test_main_rejects_options_the_mode_would_ignore(tmp_path: Path, monkeypatch, capsys, options, message) -> None:
+    monkeypatch.setattr(sys, "argv", ["main.py", str(tmp_path / "evidence.img"), *options])
+    with pytest.raises(SystemExit):
+        main()
+    assert message in capsys.readouterr().err
+
+
+def test_mixed_entropy_candidate_agrees_between_run_scan_and_scan_range(tmp_path: Path) -> None:
+    evidence = tmp_path / "mixed.img"
+    payload = bytearray(os.urandom(1024 * 1024).replace(b"\xff\xd8", b"\x00\x00"))
+
+    # 50 sectores: 36 % aleatorios y 65 % a ceros. La entropía real (~3.7) supera el umbral,
+    # pero la media de las entropías por sector (~2.8) no.
+    sectors = [os.urandom(4096).replace(b"\xff", b"\x00") if index % 20 < 6 else bytes(4096) for index in range(50)]
+    body = b"".join(sectors)
+    jpeg = b"\xff\xd8\xff" + body[3:] + b"\xff\xd9"
+    start = 64 * 4096
+    payload[start : start + len(jpeg)] = jpeg
+    evidence.write_bytes(payload)
+    assert FileValidator.calculate_entropy(jpeg) > 3.0
+
+    _, _, json_report = run_scan(str(evidence), str(tmp_path / "reports"), block_size=256 * 1024)
+    local = {(item["offset"], item["size_bytes"]) for item in json.loads(Path(json_report).read_text(encoding="utf-8"))["files"]}
+    distributed = {(item["offset"], item["size_bytes"]) for item in scan_range(str(evidence), 0, len(payload), 256 * 1024)}
+
+    assert (hex(start), len(jpeg)) in local
+    assert local == distributed
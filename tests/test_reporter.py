@@ -1,5 +1,8 @@
+import base64
+import gzip
 from pathlib import Path
 
+import post_processing.reporter as reporter_module
 from post_processing.reporter import ForensicReporter
 
 
@@ -35,6 +38,7 @@ def test_export_json_includes_integrity_summary(tmp_path: Path) -> None:
     assert payload['integrity']['hashes_total'] == 2
     assert payload['integrity']['hashes_unicos'] == 1
     assert payload['integrity']['hashes_duplicados'] == 1
+    assert 'conocidos' not in payload['integrity']
 
 
 def test_export_csv_generates_tabular_report(tmp_path: Path) -> None:
@@ -45,8 +49,9 @@ def test_export_csv_generates_tabular_report(tmp_path: Path) -> None:
     reporter.export_csv(str(csv_path))
 
     content = csv_path.read_text(encoding='utf-8')
-    assert 'name,type,size_bytes,size_kb,offset,hash' in content
+    assert content.splitlines()[0] == 'name,type,size_bytes,size_kb,offset,hash'
     assert 'evidence.jpg,JPEG,4096,4.0,0x10,' in content
+    assert 'known' not in reporter.files_recovered[0]
 
 
 def test_generate_html_adds_responsive_and_integrity_cards(tmp_path: Path) -> None:
@@ -71,3 +76,112 @@ def test_generate_html_handles_empty_result_set(tmp_path: Path) -> None:
 
     content = report_path.read_text(encoding='utf-8')
     assert 'No se detectaron archivos válidos.' in content
+
+
+def test_generate_html_includes_block_layout(tmp_path: Path) -> None:
+    reporter = ForensicReporter(case_id='CASE-MAP', investigator='Analyst')
+    reporter.set_block_layout([0, 1, 2, 3, 4])
+
+    report_path = tmp_path / 'layout_report.html'
+    reporter.generate_html(str(report_path))
+
+    content = report_path.read_text(encoding='utf-8')
+    assert 'Disposición de la imagen' in content
+    assert 'const layout = [0, 1, 2, 3, 4];' in content
+
+
+def test_merge_fragments_deduplicates_and_orders_by_offset() -> None:
+    first = ForensicReporter(case_id='CASE-R1', investigator='Worker A')
+    first.add_entry('JPEG_0001', 'JPEG', 100, 4096, 'b' * 64)
+    first.add_entry('JPEG_0002', 'JPEG', 100, 8192, 'c' * 64)
+    second = ForensicReporter(case_id='CASE-R2', investigator='Worker B')
+    second.add_entry('JPEG_0001', 'JPEG', 100, 16, 'a' * 64)
+    second.add_entry('JPEG_0002', 'JPEG', 100, 8192, 'c' * 64)
+
+    merged = ForensicReporter(case_id='CASE-R', investigator='Coordinator')
+    merged.merge_fragments([first.files_recovered, second.files_recovered])
+
+    assert [item['offset'] for item in merged.files_recovered] == ['0x10', '0x1000', '0x2000']
+    assert [item['name'] for item in merged.files_recovered] == ['JPEG_0001', 'JPEG_0002', 'JPEG_0003']
+
+
+def _decode_shard(script: str) -> list:
+    payload = script.split('"')[1]
+    return __import__('json').loads(gzip.decompress(base64.b64decode(payload)))
+
+
+def test_generate_html_embeds_single_shard_for_small_reports(tmp_path: Path) -> None:
+    reporter = ForensicReporter(case_id='CASE-SMALL', investigator='Analyst')
+    reporter.add_entry('one.jpg', 'JPEG</script>', 2048, 32, 'a' * 64)
+
+    report_path = tmp_path / 'small.html'
+    reporter.generate_html(str(report_path))
+
+    content = report_path.read_text(encoding='utf-8')
+    assert not (tmp_path / 'small_shards').exists()
+    assert "id='pageNote'" not in content
+    assert 'URP.shard(0, "' in content
+    assert '"JPEG\\u003c/script>"' in content
+
+
+def test_generate_html_writes_lazy_shards_for_large_reports(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(reporter_module, 'HTML_SHARD_ROWS', 40)
+    monkeypatch.setattr(reporter_module, 'HTML_PAGE_ROWS', 10)
+    reporter = ForensicReporter(case_id='CASE-BIG', investigator='Analyst')
+    for index in range(100):
+        reporter.add_entry(f'file_{index:03d}', 'PNG' if index >= 80 else 'JPEG', 1024, index * 4096, 'f' * 64)
+
+    report_path = tmp_path / 'big.html'
+    reporter.generate_html(str(report_path))
+
+    content = report_path.read_text(encoding='utf-8')
+    assert 'file_009' in content
+    assert 'file_010' not in content
+    assert "90 detecciones más; abra el reporte en un navegador compatible o use el JSON/CSV." in content
+    assert '<script>URP.shard(' not in content
+
+    shards = sorted((tmp_path / 'big_shards').glob('shard_*.js'))
+    assert [shard.name for shard in shards] == ['shard_00000.js', 'shard_00001.js', 'shard_00002.js']
+    last_rows = _decode_shard(shards[-1].read_text(encoding='ascii'))
+    assert len(last_rows) == 20
+    assert last_rows[-1] == ['file_099', 'PNG', 1.0, hex(99 * 4096), 'f' * 64, 0]
+    assert '"file": "big_shards/shard_00002.js"' in content
+    assert '"types": {"JPEG": 40}' in content
+
+    # Regenerar con menos filas no deja shards huérfanos; con un único shard el directorio desaparece.
+    reporter.files_recovered = reporter.files_recovered[:50]
+    reporter.generate_html(str(report_path))
+    assert [shard.name for shard in sorted((tmp_path / 'big_shards').glob('*'))] == ['shard_00000.js', 'shard_00001.js']
+    reporter.files_recovered = reporter.files_recovered[:5]
+    reporter.generate_html(str(report_path))
+    assert not (tmp_path / 'big_shards').exists()
+
+
+def test_known_hashes_are_tagged_or_suppressed(tmp_path: Path) -> None:
+    tagged = ForensicReporter(case_id='CASE-KNOWN', investigator='Analyst')
+    tagged.set_known_hashes({'a' * 64})
+    tagged.add_entry('os.dll.jpg', 'JPEG', 100, 0, 'a' * 64)
+    tagged.add_entry('photo.jpg', 'JPEG', 100, 4096, 'b' * 64)
+
+    assert [item['known'] for item in tagged.files_recovered] == [True, False]
+    csv_path = tmp_path / 'known.csv'
+    tagged.export_csv(str(csv_path))
+    assert csv_path.read_text(encoding='utf-8').splitlines()[:2] == [
+        'name,type,size_bytes,size_kb,offset,hash,known',
+        'os.dll.jpg,JPEG,100,0.1,0x0,' + 'a' * 64 + ',True',
+    ]
+    report_path = tmp_path / 'known.html'
+    tagged.generate_html(str(report_path))
+    assert "<tr class='known'>" in report_path.read_text(encoding='utf-8')
+
+    suppressed = ForensicReporter(case_id='CASE-KNOWN', investigator='Analyst')
+    suppressed.set_known_hashes({'a' * 64}, suppress=True)
+    suppressed.add_entry('os.dll.jpg', 'JPEG', 100, 0, 'a' * 64)
+    suppressed.merge_fragments([[{'name': 'x', 'type': 'JPEG', 'size_bytes': 1, 'size_kb': 0.0, 'offset': '0x10', 'hash': 'a' * 64}]])
+    suppressed.add_entry('photo.jpg', 'JPEG', 100, 4096, 'b' * 64)
+
+    json_path = tmp_path / 'known.json'
+    suppressed.export_json(str(json_path))
+    payload = __import__('json').loads(json_path.read_text(encoding='utf-8'))
+    assert [item['hash'] for item in payload['files']] == ['b' * 64]
+    assert payload['integrity']['conocidos_omitidos'] == 2
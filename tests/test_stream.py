@@ -0,0 +1,89 @@
+import hashlib
+import json
+import os
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import pytest
+
+from core.stream import StreamSource, is_stream_source
+from main import revalidate, run_scan
+
+
+def _feed_fifo(path: Path, payload: bytes) -> threading.Thread:
+    os.mkfifo(path)
+
+    def write() -> None:
+        with path.open("wb") as fifo:
+            for start in range(0, len(payload), 10_000):
+                fifo.write(payload[start : start + 10_000])
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    return writer
+
+
+def test_stream_source_keeps_only_the_window(tmp_path: Path) -> None:
+    payload = os.urandom(10_000)
+    fifo = tmp_path / "small.fifo"
+    writer = _feed_fifo(fifo, payload)
+    assert is_stream_source(str(fifo))
+
+    source = StreamSource(str(fifo), block_size=1000, window_size=1500)
+    source.open_device()
+    try:
+        chunks = []
+        for offset, segment in source.iter_segments():
+            chunks.append(segment.tobytes())
+            # El bloque anticipado hace que size solo alcance el final del segmento en el último.
+            assert (offset + len(segment) == source.size) == (offset == 9000)
+            segment.release()
+        assert b"".join(chunks) == payload
+
+        tail = source.read_exact(6500, 3500)
+        assert tail.tobytes() == payload[6500:]
+        tail.release()
+        with pytest.raises(ValueError):
+            source.get_segment(0, 10)
+        assert source.get_device_metadata()["sha256"] == hashlib.sha256(payload).hexdigest()
+    finally:
+        source.close()
+        writer.join()
+
+
+def test_streaming_scan_matches_post_acquisition_scan(tmp_path: Path) -> None:
+    payload = bytearray(os.urandom(1024 * 1024).replace(b"\xff\xd8", b"\x00\x00"))
+    for start in (4096, 300_000, 1024 * 1024 - 9000):
+        jpeg = b"\xff\xd8\xff" + os.urandom(5000).replace(b"\xff\xd9", b"\x00\x00") + b"\xff\xd9"
+        payload[start : start + len(jpeg)] = jpeg
+    evidence = tmp_path / "acquired.img"
+    evidence.write_bytes(payload)
+
+    _, _, file_json = run_scan(str(evidence), str(tmp_path / "file"), block_size=64 * 1024)
+
+    fifo = tmp_path / "acquisition.fifo"
+    copy = tmp_path / "copy.img"
+    writer = _feed_fifo(fifo, bytes(payload))
+    detections, _, stream_json = run_scan(str(fifo), str(tmp_path / "stream"), block_size=64 * 1024, image_copy=str(copy))
+    writer.join()
+
+    expected = json.loads(Path(file_json).read_text(encoding="utf-8"))["files"]
+    streamed = json.loads(Path(stream_json).read_text(encoding="utf-8"))["files"]
+    assert detections == len(expected) == 3
+    assert streamed == expected
+    assert copy.read_bytes() == bytes(payload)
+
+    # El SHA-256 de la adquisición queda en disco y verifica la copia.
+    acquired_hash = hashlib.sha256(copy.read_bytes()).hexdigest()
+    assert json.loads(Path(stream_json).read_text(encoding="utf-8"))["image_sha256"] == acquired_hash
+    index_meta = json.loads((tmp_path / "stream" / "candidates.json").read_text(encoding="utf-8"))
+    assert index_meta["image_sha256"] == acquired_hash
+    assert "image_sha256" not in json.loads(Path(file_json).read_text(encoding="utf-8"))
+
+    # El índice de candidatos queda ligado a la copia y permite re-validar sin el stream.
+    revalidated, _, revalidated_json = revalidate(str(copy), str(tmp_path / "stream"))
+    assert revalidated == 3
+    assert json.loads(Path(revalidated_json).read_text(encoding="utf-8"))["image_sha256"] == acquired_hash
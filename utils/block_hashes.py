@@ -0,0 +1,212 @@
+import hashlib
+import json
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import numpy as np
+
+SECTOR_SIZE = 4096
+SECTOR_WORDS = SECTOR_SIZE // 8
+# Registro por bloque indexado; `key` se replica en block_keys.bin (contiguo) para la búsqueda.
+BLOCK_RECORD_DTYPE = np.dtype(
+    [
+        ("key", "<u8"),
+        ("digest", np.void, 16),
+        ("file", "<u4"),
+        ("block", "<u4"),
+    ]
+)
+PREFIX_BITS = 24
+# Sectores por lote al construir el índice.
+BUILD_SECTORS = 256
+DEFAULT_HASH_SEED = 0x55525042
+
+
+def _key_coefficients(seed: int) -> np.ndarray:
+    # Coeficientes impares: la clave es una combinación lineal mod 2**64 de las palabras del sector.
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 2 ** 63, size=SECTOR_WORDS, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+
+
+def _sector_words(data, sectors: int) -> np.ndarray:
+    return np.frombuffer(data, dtype="<u8", count=sectors * SECTOR_WORDS).reshape(sectors, SECTOR_WORDS)
+
+
+def _prefix_masks(prefixes: np.ndarray) -> np.ndarray:
+    return np.left_shift(np.uint8(1), (prefixes & np.uint64(7)).astype(np.uint8))
+
+
+def sector_digest(sector) -> bytes:
+    """SHA-256 truncado a 16 bytes; confirma las coincidencias de la clave rápida."""
+    return hashlib.sha256(sector).digest()[:16]
+
+
+def iter_target_files(path: str | Path) -> Iterator[Path]:
+    """Archivo objetivo individual o todos los archivos bajo un directorio, en orden estable."""
+    root = Path(path)
+    if root.is_file():
+        yield root
+        return
+    for candidate in sorted(root.rglob("*")):
+        if candidate.is_file():
+            yield candidate
+
+
+class BlockHashIndex:
+    """
+    Índice de hashes por bloque de 4 KiB de archivos objetivo, para localizar fragmentos
+    sin header. Cada bloque se resume con una clave de 64 bits calculable en lote con numpy
+    (`sector_keys`) y un SHA-256 truncado que confirma las coincidencias. Las claves ordenadas
+    (`block_keys.bin`) y los registros (`block_records.bin`) se mapean en memoria; delante va
+    un bitmap de prefijos de 24 bits que descarta casi todos los sectores sin búsqueda binaria.
+    """
+
+    def __init__(self, directory: str | Path, hash_seed: int = DEFAULT_HASH_SEED):
+        self.directory = Path(directory)
+        self.hash_seed = hash_seed
+        self.count = 0
+        # name, size_bytes e indexed_blocks (bloques con contenido; denominador de la cobertura).
+        self.files: list[dict] = []
+        self._coefficients = _key_coefficients(hash_seed)
+        self._keys: np.ndarray | None = None
+        self._records: np.ndarray | None = None
+        self._prefixes: np.ndarray | None = None
+
+    @property
+    def keys_path(self) -> Path:
+        return self.directory / "block_keys.bin"
+
+    @property
+    def records_path(self) -> Path:
+        return self.directory / "block_records.bin"
+
+    @property
+    def prefix_path(self) -> Path:
+        return self.directory / "block_prefixes.bin"
+
+    @property
+    def meta_path(self) -> Path:
+        return self.directory / "block_hashes.json"
+
+    def sector_keys(self, data, sectors: int) -> np.ndarray:
+        """Claves de los primeros `sectors` sectores completos de `data`, en una sola operación."""
+        return _sector_words(data, sectors) @ self._coefficients
+
+    @classmethod
+    def build(
+        cls,
+        targets: Iterable[str | Path],
+        directory: str | Path,
+        hash_seed: int = DEFAULT_HASH_SEED,
+    ) -> "BlockHashIndex":
+        """
+        Indexa los bloques completos de 4 KiB de cada archivo objetivo. Se omiten los bloques
+        de contenido repetitivo (ceros, relleno constante): aparecen en cualquier disco y no
+        identifican al archivo. Los registros se ordenan en disco (memmap) por clave.
+        """
+        index = cls(directory, hash_seed)
+        index.directory.mkdir(parents=True, exist_ok=True)
+
+        with index.records_path.open("wb") as records_file:
+            for file_number, target in enumerate(targets):
+                indexed = 0
+                size = 0
+                with Path(target).open("rb") as source:
+                    block_number = 0
+                    while True:
+                        data = source.read(BUILD_SECTORS * SECTOR_SIZE)
+                        size += len(data)
+                        sectors = len(data) // SECTOR_SIZE
+                        if sectors == 0:
+                            break
+                        words = _sector_words(data, sectors)
+                        informative = ~(words == words[:, :1]).all(axis=1)
+                        keys = words @ index._coefficients
+                        batch = np.zeros(int(informative.sum()), dtype=BLOCK_RECORD_DTYPE)
+                        positions = np.flatnonzero(informative)
+                        batch["key"] = keys[positions]
+                        batch["file"] = file_number
+                        batch["block"] = block_number + positions
+                        digests = b"".join(
+                            sector_digest(data[sector * SECTOR_SIZE:(sector + 1) * SECTOR_SIZE]) for sector in positions
+                        )
+                        batch["digest"] = np.frombuffer(digests, dtype="V16")
+                        batch.tofile(records_file)
+                        indexed += len(batch)
+                        block_number += sectors
+                        if len(data) < BUILD_SECTORS * SECTOR_SIZE:
+                            break
+                index.files.append({"name": str(target), "size_bytes": size, "indexed_blocks": indexed})
+                index.count += indexed
+
+        index._sort_and_summarize()
+        meta = {"count": index.count, "hash_seed": hash_seed, "files": index.files}
+        index.meta_path.write_text(json.dumps(meta, indent=2, ensure_ascii=False), encoding="utf-8")
+        index._open()
+        return index
+
+    def _sort_and_summarize(self) -> None:
+        prefixes = np.zeros(1 << (PREFIX_BITS - 3), dtype=np.uint8)
+        if self.count:
+            records = np.memmap(self.records_path, dtype=BLOCK_RECORD_DTYPE, mode="r+", shape=(self.count,))
+            records.sort(order="key", kind="stable")
+            records.flush()
+            keys = np.ascontiguousarray(records["key"])
+            keys.tofile(self.keys_path)
+            top = keys >> np.uint64(64 - PREFIX_BITS)
+            np.bitwise_or.at(prefixes, top >> np.uint64(3), _prefix_masks(top))
+            del records
+        else:
+            self.keys_path.write_bytes(b"")
+        prefixes.tofile(self.prefix_path)
+
+    @classmethod
+    def load(cls, directory: str | Path) -> "BlockHashIndex":
+        directory = Path(directory)
+        meta_path = directory / "block_hashes.json"
+        if not meta_path.exists():
+            raise FileNotFoundError(f"No existe un índice de hashes por bloque en {directory}")
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        index = cls(directory, meta["hash_seed"])
+        index.count = meta["count"]
+        index.files = meta["files"]
+        index._open()
+        return index
+
+    def _open(self) -> None:
+        self._prefixes = np.fromfile(self.prefix_path, dtype=np.uint8)
+        if self.count:
+            self._keys = np.memmap(self.keys_path, dtype="<u8", mode="r", shape=(self.count,))
+            self._records = np.memmap(self.records_path, dtype=BLOCK_RECORD_DTYPE, mode="r", shape=(self.count,))
+
+    def lookup(self, data, sectors: int) -> Iterator[tuple[int, list[tuple[int, int]]]]:
+        """
+        Busca en lote los primeros `sectors` sectores de `data`. Produce, por cada sector
+        coincidente y en orden, (sector relativo, [(archivo, bloque), ...]) ya confirmados por SHA-256.
+        """
+        if self._keys is None or sectors == 0:
+            return
+        keys = self.sector_keys(data, sectors)
+        top = keys >> np.uint64(64 - PREFIX_BITS)
+        maybe = np.flatnonzero(self._prefixes[top >> np.uint64(3)] & _prefix_masks(top))
+        if len(maybe) == 0:
+            return
+        starts = np.searchsorted(self._keys, keys[maybe])
+        for sector, start in zip(maybe.tolist(), starts.tolist()):
+            key = keys[sector]
+            if start >= self.count or self._keys[start] != key:
+                continue
+            digest = sector_digest(data[sector * SECTOR_SIZE:(sector + 1) * SECTOR_SIZE])
+            matches = []
+            position = start
+            while position < self.count and self._keys[position] == key:
+                record = self._records[position]
+                if record["digest"].tobytes() == digest:
+                    matches.append((int(record["file"]), int(record["block"])))
+                position += 1
+            if matches:
+                yield sector, matches
+
+    def close(self) -> None:
+        self._keys = None
+        self._records = None
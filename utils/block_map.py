@@ -0,0 +1,152 @@
+import json
+import os
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+
+from utils.identifiers import BytesLike
+
+SECTOR_SIZE = 4096
+# Entropía cuantizada en 1/32 de bit: 8 bits/byte -> 256 (se satura a 255).
+ENTROPY_SCALE = 32
+FLAG_ZERO = 0x01
+CLASSIFY_BATCH_SECTORS = 256
+
+BLOCK_DTYPE = np.dtype([("entropy", np.uint8), ("flags", np.uint8), ("headers", np.uint16)])
+
+LAYOUT_ZERO = 0
+LAYOUT_LOW = 1
+LAYOUT_MEDIUM = 2
+LAYOUT_HIGH = 3
+LAYOUT_HEADER = 4
+LOW_ENTROPY_LIMIT = 3.0
+HIGH_ENTROPY_LIMIT = 7.5
+
+
+class BlockMap:
+    """
+    Mapa compacto por sector (4 KiB) calculado una sola vez por imagen:
+    entropía cuantizada, flag de sector a ceros y máscara de headers detectados.
+    Se persiste como `.npy` mapeado en memoria junto a los reportes.
+    """
+
+    def __init__(self, path: str | Path, size_bytes: int, header_types: Iterable[str], sector_size: int = SECTOR_SIZE):
+        self.path = Path(path)
+        self.size_bytes = size_bytes
+        self.sector_size = sector_size
+        self.header_types = list(header_types)
+        if len(self.header_types) > 16:
+            raise ValueError("BlockMap soporta como máximo 16 tipos de header")
+
+        sectors = -(-size_bytes // sector_size)
+        self.sectors = np.lib.format.open_memmap(self.path, mode="w+", dtype=BLOCK_DTYPE, shape=(sectors,))
+
+    @classmethod
+    def load(cls, path: str | Path) -> "BlockMap":
+        """Abre en solo lectura un mapa persistido por un escaneo previo."""
+        path = Path(path)
+        sidecar = json.loads(path.with_suffix(".json").read_text(encoding="utf-8"))
+        block_map = cls.__new__(cls)
+        block_map.path = path
+        block_map.size_bytes = sidecar["size_bytes"]
+        block_map.sector_size = sidecar["sector_size"]
+        block_map.header_types = sidecar["header_types"]
+        block_map.sectors = np.load(path, mmap_mode="r")
+        return block_map
+
+    def _ensure_capacity(self, end: int) -> None:
+        """
+        Amplía el mapa (duplicando) cuando el origen no declara su tamaño de antemano,
+        como en la lectura por streaming. `close()` lo recorta al tamaño final.
+        """
+        self.size_bytes = max(self.size_bytes, end)
+        needed = -(-end // self.sector_size)
+        if needed > len(self.sectors):
+            self._resize(max(needed, 2 * len(self.sectors)))
+
+    def _resize(self, sectors: int) -> None:
+        previous = self.sectors
+        staging = self.path.with_name(f"{self.path.stem}.resize.npy")
+        resized = np.lib.format.open_memmap(staging, mode="w+", dtype=BLOCK_DTYPE, shape=(sectors,))
+        kept = min(sectors, len(previous))
+        resized[:kept] = previous[:kept]
+        resized.flush()
+        del previous
+        self.sectors = resized
+        os.replace(staging, self.path)
+
+    def classify(self, offset: int, data: BytesLike) -> None:
+        """Clasifica un rango alineado a sector; solo el último sector de la imagen puede ser parcial."""
+        if offset % self.sector_size:
+            raise ValueError("offset debe estar alineado a sector")
+
+        self._ensure_capacity(offset + len(data))
+        raw = np.frombuffer(data, dtype=np.uint8)
+        first = offset // self.sector_size
+        full = len(raw) // self.sector_size
+        batch = CLASSIFY_BATCH_SECTORS
+        for start in range(0, full, batch):
+            count = min(batch, full - start)
+            rows = raw[start * self.sector_size:(start + count) * self.sector_size].reshape(count, self.sector_size)
+            self._classify_rows(first + start, rows)
+
+        if len(raw) % self.sector_size:
+            self._classify_rows(first + full, raw[full * self.sector_size:].reshape(1, -1))
+        del raw
+
+    def _classify_rows(self, first: int, rows: np.ndarray) -> None:
+        count, width = rows.shape
+        # Histograma por fila en una sola llamada: cada fila usa su propio rango de 256 cubetas.
+        index = (np.arange(count, dtype=np.int64)[:, None] * 256 + rows).ravel()
+        counts = np.bincount(index, minlength=count * 256).reshape(count, 256)
+
+        probabilities = counts / width
+        logs = np.log2(probabilities, out=np.zeros_like(probabilities), where=counts > 0)
+        entropy = -(probabilities * logs).sum(axis=1)
+
+        target = self.sectors[first:first + count]
+        target["entropy"] = np.minimum(np.rint(entropy * ENTROPY_SCALE), 255).astype(np.uint8)
+        target["flags"] = np.where(counts[:, 0] == width, FLAG_ZERO, 0).astype(np.uint8)
+
+    def mark_header(self, offset: int, file_type: str) -> None:
+        if file_type not in self.header_types:
+            return
+        self._ensure_capacity(offset + 1)
+        self.sectors["headers"][offset // self.sector_size] |= np.uint16(1 << self.header_types.index(file_type))
+
+    def layout(self, cells: int = 1024) -> list[int]:
+        """Reduce el mapa a `cells` celdas (LAYOUT_*) para la vista de disposición del reporte HTML."""
+        total = len(self.sectors)
+        cells = min(cells, total)
+        if cells == 0:
+            return []
+
+        starts = np.linspace(0, total, cells + 1).astype(np.int64)[:-1]
+        lengths = np.diff(np.append(starts, total))
+        entropy = np.add.reduceat(self.sectors["entropy"].astype(np.float64), starts) / lengths / ENTROPY_SCALE
+        all_zero = np.bitwise_and.reduceat(self.sectors["flags"], starts) & FLAG_ZERO
+        headers = np.bitwise_or.reduceat(self.sectors["headers"], starts)
+
+        codes = np.full(cells, LAYOUT_MEDIUM, dtype=np.uint8)
+        codes[entropy < LOW_ENTROPY_LIMIT] = LAYOUT_LOW
+        codes[entropy >= HIGH_ENTROPY_LIMIT] = LAYOUT_HIGH
+        codes[all_zero != 0] = LAYOUT_ZERO
+        codes[headers != 0] = LAYOUT_HEADER
+        return codes.tolist()
+
+    def close(self) -> None:
+        """Vuelca el mapa a disco y escribe el sidecar JSON con su descripción."""
+        sectors = -(-self.size_bytes // self.sector_size)
+        if sectors != len(self.sectors):
+            self._resize(sectors)
+        self.sectors.flush()
+        sidecar = {
+            "sector_size": self.sector_size,
+            "size_bytes": self.size_bytes,
+            "sectors": len(self.sectors),
+            "entropy_scale": ENTROPY_SCALE,
+            "header_types": self.header_types,
+        }
+        self.path.with_suffix(".json").write_text(json.dumps(sidecar, indent=2), encoding="utf-8")
+        del self.sectors
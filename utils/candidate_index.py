@@ -0,0 +1,143 @@
+import hashlib
+import json
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import numpy as np
+
+CANDIDATE_DTYPE = np.dtype(
+    [
+        ("offset", np.uint64),
+        ("length", np.uint64),
+        ("footer", np.int64),
+        ("type", np.uint8),
+        ("entropy", np.float32),
+    ]
+)
+FLUSH_RECORDS = 65536
+# Campos de get_device_metadata() que identifican la imagen (block_size depende de la ejecución).
+IDENTITY_FIELDS = ("source", "size_bytes", "inode", "device_id", "mtime_epoch")
+
+
+def signature_fingerprint(signatures: dict) -> str:
+    """Huella SHA-256 del conjunto de firmas; cambia si cambia cualquier header, footer o max_size."""
+    canonical = {
+        name: {
+            "header": bytes(sig["header"]).hex(),
+            "footer": bytes(sig["footer"]).hex() if sig.get("footer") is not None else None,
+            "max_size": sig.get("max_size"),
+        }
+        for name, sig in signatures.items()
+    }
+    return hashlib.sha256(json.dumps(canonical, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def image_identity(metadata: dict) -> dict:
+    return {field: metadata[field] for field in IDENTITY_FIELDS}
+
+
+class CandidateIndex:
+    """
+    Índice persistente de candidatos ya delimitados (offset, tipo, footer, longitud, entropía).
+    Los registros se escriben en bloques a `candidates.bin` y se describen en `candidates.json`,
+    de modo que una re-validación solo toque los rangos de bytes de los candidatos.
+    """
+
+    def __init__(self, directory: str | Path, types: Iterable[str]):
+        self.directory = Path(directory)
+        self.types = list(types)
+        self.identity: dict = {}
+        # SHA-256 de los bytes recibidos (solo orígenes en streaming); no forma parte de la identidad.
+        self.image_sha256: str | None = None
+        self.fingerprint = ""
+        self.count = 0
+        self._buffer: list[tuple[int, int, int, int, float]] = []
+        self._file = None
+
+    @property
+    def data_path(self) -> Path:
+        return self.directory / "candidates.bin"
+
+    @property
+    def meta_path(self) -> Path:
+        return self.directory / "candidates.json"
+
+    def create(self, signatures: dict) -> None:
+        self.fingerprint = signature_fingerprint(signatures)
+        # La metadata de un escaneo anterior describiría datos que se van a sobrescribir;
+        # solo close() vuelve a escribirla, de modo que un escaneo interrumpido no deja un índice cargable.
+        self.meta_path.unlink(missing_ok=True)
+        self._file = self.data_path.open("wb")
+
+    def add(self, offset: int, file_type: str, length: int, footer: int | None, entropy: float | None) -> None:
+        self._buffer.append(
+            (
+                offset,
+                length,
+                -1 if footer is None else footer,
+                self.types.index(file_type),
+                float("nan") if entropy is None else entropy,
+            )
+        )
+        if len(self._buffer) >= FLUSH_RECORDS:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self._buffer:
+            np.array(self._buffer, dtype=CANDIDATE_DTYPE).tofile(self._file)
+            self.count += len(self._buffer)
+            self._buffer.clear()
+
+    def close(self, metadata: dict) -> None:
+        """Cierra el índice; la identidad se toma al final porque un stream no conoce su tamaño antes."""
+        if self._file is None:
+            return
+        self.identity = image_identity(metadata)
+        self.image_sha256 = metadata.get("sha256")
+        self._flush()
+        self._file.close()
+        self._file = None
+        meta = {
+            "identity": self.identity,
+            "signature_fingerprint": self.fingerprint,
+            "types": self.types,
+            "count": self.count,
+        }
+        if self.image_sha256 is not None:
+            meta["image_sha256"] = self.image_sha256
+        self.meta_path.write_text(json.dumps(meta, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    @classmethod
+    def load(cls, directory: str | Path) -> "CandidateIndex":
+        index = cls(directory, [])
+        if not index.meta_path.exists() or not index.data_path.exists():
+            raise FileNotFoundError(f"No existe un índice de candidatos en {index.directory}")
+        meta = json.loads(index.meta_path.read_text(encoding="utf-8"))
+        index.identity = meta["identity"]
+        index.fingerprint = meta["signature_fingerprint"]
+        index.types = meta["types"]
+        index.count = meta["count"]
+        index.image_sha256 = meta.get("image_sha256")
+        return index
+
+    def ensure_matches(self, metadata: dict, signatures: dict) -> None:
+        """Verifica que el índice corresponda a la misma imagen y al mismo conjunto de firmas."""
+        if image_identity(metadata) != self.identity:
+            raise ValueError("El índice de candidatos pertenece a otra imagen; se requiere un nuevo escaneo")
+        if signature_fingerprint(signatures) != self.fingerprint:
+            raise ValueError("El conjunto de firmas cambió desde el escaneo; se requiere un nuevo escaneo")
+
+    def __iter__(self) -> Iterator[tuple[int, str, int, int | None, float | None]]:
+        if self.count == 0:
+            return
+        records = np.memmap(self.data_path, dtype=CANDIDATE_DTYPE, mode="r", shape=(self.count,))
+        for start in range(0, self.count, FLUSH_RECORDS):
+            for offset, length, footer, type_index, entropy in records[start:start + FLUSH_RECORDS].tolist():
+                yield (
+                    offset,
+                    self.types[type_index],
+                    length,
+                    None if footer < 0 else footer,
+                    None if entropy != entropy else entropy,
+                )
+        del records
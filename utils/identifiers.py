@@ -4,6 +4,7 @@ import math
 BytesLike = bytes | bytearray | memoryview
 HASH_STREAMING_THRESHOLD = 1024 * 1024
 HASH_STREAMING_CHUNK_SIZE = 1024 * 1024
+DEFAULT_ENTROPY_THRESHOLD = 3.0
 
 
 class FileValidator:
@@ -29,57 +30,44 @@ class FileValidator:
         return entropy
 
     @staticmethod
-    def check_entropy(data_chunk: BytesLike, threshold: float = 3.0) -> bool:
-        """Descarta bloques con baja entropía (ej. ceros repetidos o basura)."""
-        return FileValidator.calculate_entropy(data_chunk) > threshold
+    def check_entropy(data_chunk: BytesLike, threshold: float = DEFAULT_ENTROPY_THRESHOLD, entropy: float | None = None) -> bool:
+        """
+        Descarta bloques con baja entropía (ej. ceros repetidos o basura).
+        Si se aporta `entropy` precalculada (ej. desde `CandidateIndex`) no se recorren los datos.
+        """
+        if entropy is None:
+            entropy = FileValidator.calculate_entropy(data_chunk)
+        return entropy > threshold
 
     @staticmethod
-    def _candidate_length(view: memoryview, file_type: str) -> int | None:
-        """Intenta estimar el final real de un archivo embebido dentro de una ventana de bytes."""
-        blob = view.tobytes()
-
+    def length_from_footer(view: memoryview, file_type: str, footer_index: int) -> int | None:
+        """Calcula la longitud estructural a partir de la posición (relativa) de un footer ya localizado."""
         if file_type == "JPEG":
-            if len(blob) < 2 or blob[:2] != b"\xff\xd8":
-                return None
-            eoi_index = blob.find(b"\xff\xd9", 2)
-            return eoi_index + 2 if eoi_index != -1 else None
+            return footer_index + 2
 
         if file_type == "PNG":
-            if len(blob) < 8 or blob[:8] != b"\x89PNG\r\n\x1a\n":
-                return None
-            iend_index = blob.find(b"IEND", 8)
-            return iend_index + 8 if iend_index != -1 else None
+            # "IEND" + CRC de 4 bytes
+            return footer_index + 8
 
         if file_type in {"ZIP", "DOCX"}:
-            eocd_index = blob.find(b"\x50\x4b\x05\x06")
-            if eocd_index == -1 or eocd_index + 22 > len(blob):
-                return None
-            comment_len = int.from_bytes(blob[eocd_index + 20:eocd_index + 22], "little")
-            end = eocd_index + 22 + comment_len
-            return end if end <= len(blob) else None
-
-        if file_type == "MP4":
-            if b"ftyp" in blob[:4096]:
+            if footer_index + 22 > len(view):
                 return None
-            return None
+            comment_len = int.from_bytes(view[footer_index + 20:footer_index + 22], "little")
+            end = footer_index + 22 + comment_len
+            return end if end <= len(view) else None
 
         return None
 
-    @staticmethod
-    def trim_to_structure(file_bytes: BytesLike, file_type: str) -> memoryview:
-        """Devuelve una vista recortada al final estructural detectado cuando sea posible."""
-        view = file_bytes if isinstance(file_bytes, memoryview) else memoryview(file_bytes)
-        length = FileValidator._candidate_length(view, file_type)
-        if length is None:
-            return view
-        return view[:length]
-
     @staticmethod
     def validate_structure(file_bytes: BytesLike, file_type: str) -> bool:
         """
         Validación profunda según el tipo de archivo.
         """
         view = file_bytes if isinstance(file_bytes, memoryview) else memoryview(file_bytes)
+        if file_type == "MP4":
+            # Solo se inspecciona la cabecera; copiar la ventana completa sería innecesario.
+            return b"ftyp" in view[:4096].tobytes()
+
         blob = view.tobytes()
 
         if file_type == "JPEG":
@@ -92,9 +80,6 @@ class FileValidator:
             header_ok = len(blob) >= 8 and blob[:8] == b"\x89PNG\r\n\x1a\n"
             return header_ok and b"IEND" in blob
 
-        if file_type == "MP4":
-            return b"ftyp" in blob[:4096]
-
         return True
 
     @staticmethod
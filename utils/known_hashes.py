@@ -0,0 +1,216 @@
+import heapq
+import json
+import math
+import shutil
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import numpy as np
+
+DIGEST_SIZE = 32
+DIGEST_DTYPE = np.dtype((np.void, DIGEST_SIZE))
+# Digests por run ordenado en memoria durante la construcción (128 MiB).
+RUN_DIGESTS = 4 * 1024 * 1024
+# Digests por lote al recorrer el arreglo mapeado (construcción del Bloom y merge).
+SCAN_DIGESTS = 256 * 1024
+DEFAULT_FALSE_POSITIVE_RATE = 0.001
+MAX_BLOOM_HASHES = 16
+MASK_64 = (1 << 64) - 1
+
+
+def _parse_digest(line: str) -> bytes | None:
+    """Toma el primer campo de la línea si es un SHA-256 hex (formato `sha256sum` o un hash por línea)."""
+    fields = line.split(maxsplit=1)
+    if not fields or len(fields[0]) != 2 * DIGEST_SIZE:
+        return None
+    try:
+        return bytes.fromhex(fields[0])
+    except ValueError:
+        return None
+
+
+def _bloom_geometry(count: int, false_positive_rate: float) -> tuple[int, int]:
+    """Bits y cantidad de funciones hash óptimos para `count` elementos."""
+    bits = max(64, math.ceil(-count * math.log(false_positive_rate) / math.log(2) ** 2))
+    bits += -bits % 8
+    hashes = min(MAX_BLOOM_HASHES, max(1, round(bits / max(count, 1) * math.log(2))))
+    return bits, hashes
+
+
+class KnownHashSet:
+    """
+    Conjunto de SHA-256 conocidos (archivos de sistema operativo, software de fabricantes)
+    almacenado como arreglo binario ordenado de digests de 32 bytes (`hashes.bin`) con un
+    filtro de Bloom delante (`bloom.bin`). Ambos se mapean en memoria: una consulta toca
+    k bits del filtro y, solo si todos están activos, hace búsqueda binaria en el arreglo.
+    """
+
+    def __init__(self, directory: str | Path):
+        self.directory = Path(directory)
+        self.count = 0
+        self.bloom_bits = 0
+        self.bloom_hashes = 0
+        self._hashes: np.memmap | None = None
+        self._bloom: np.memmap | None = None
+
+    @property
+    def hashes_path(self) -> Path:
+        return self.directory / "hashes.bin"
+
+    @property
+    def bloom_path(self) -> Path:
+        return self.directory / "bloom.bin"
+
+    @property
+    def meta_path(self) -> Path:
+        return self.directory / "known_hashes.json"
+
+    @classmethod
+    def build(
+        cls,
+        hash_lists: Iterable[str | Path],
+        directory: str | Path,
+        false_positive_rate: float = DEFAULT_FALSE_POSITIVE_RATE,
+        run_digests: int = RUN_DIGESTS,
+    ) -> "KnownHashSet":
+        """
+        Construye el conjunto desde listas de texto con un SHA-256 hex por línea.
+        Ordena por runs de `run_digests` y los fusiona en disco, de modo que la memoria
+        no depende del tamaño de la lista.
+        """
+        hash_lists = list(hash_lists)
+        known = cls(directory)
+        known.directory.mkdir(parents=True, exist_ok=True)
+        runs_dir = known.directory / "runs"
+        runs_dir.mkdir(exist_ok=True)
+        runs: list[Path] = []
+        buffer = bytearray()
+
+        def flush_run() -> None:
+            if not buffer:
+                return
+            digests = np.frombuffer(bytes(buffer), dtype=DIGEST_DTYPE).copy()
+            digests.sort()
+            run_path = runs_dir / f"run_{len(runs):05d}.bin"
+            digests.tofile(run_path)
+            runs.append(run_path)
+            buffer.clear()
+
+        for hash_list in hash_lists:
+            with Path(hash_list).open("r", encoding="utf-8", errors="replace") as lines:
+                for line in lines:
+                    digest = _parse_digest(line)
+                    if digest is None:
+                        continue
+                    buffer += digest
+                    if len(buffer) >= run_digests * DIGEST_SIZE:
+                        flush_run()
+        flush_run()
+
+        known.count = known._merge_runs(runs)
+        shutil.rmtree(runs_dir)
+        known._build_bloom(false_positive_rate)
+        meta = {
+            "count": known.count,
+            "bloom_bits": known.bloom_bits,
+            "bloom_hashes": known.bloom_hashes,
+            "false_positive_rate": false_positive_rate,
+            "sources": [Path(hash_list).name for hash_list in hash_lists],
+        }
+        known.meta_path.write_text(json.dumps(meta, indent=2, ensure_ascii=False), encoding="utf-8")
+        known._open()
+        return known
+
+    @staticmethod
+    def _iter_run(run_path: Path) -> Iterator[bytes]:
+        count = run_path.stat().st_size // DIGEST_SIZE
+        if count == 0:
+            return
+        digests = np.memmap(run_path, dtype=np.uint8, mode="r", shape=(count * DIGEST_SIZE,))
+        for start in range(0, count, SCAN_DIGESTS):
+            block = digests[start * DIGEST_SIZE:(start + SCAN_DIGESTS) * DIGEST_SIZE].tobytes()
+            for position in range(0, len(block), DIGEST_SIZE):
+                yield block[position:position + DIGEST_SIZE]
+        del digests
+
+    def _merge_runs(self, runs: list[Path]) -> int:
+        """Fusiona los runs ordenados en `hashes.bin` descartando duplicados; retorna la cantidad."""
+        count = 0
+        previous = None
+        pending = bytearray()
+        with self.hashes_path.open("wb") as output:
+            for digest in heapq.merge(*(self._iter_run(run_path) for run_path in runs)):
+                if digest == previous:
+                    continue
+                previous = digest
+                pending += digest
+                count += 1
+                if len(pending) >= SCAN_DIGESTS * DIGEST_SIZE:
+                    output.write(pending)
+                    pending.clear()
+            output.write(pending)
+        return count
+
+    def _build_bloom(self, false_positive_rate: float) -> None:
+        self.bloom_bits, self.bloom_hashes = _bloom_geometry(self.count, false_positive_rate)
+        bloom = np.zeros(self.bloom_bits // 8, dtype=np.uint8)
+        if self.count:
+            words = np.memmap(self.hashes_path, dtype="<u8", mode="r", shape=(self.count, DIGEST_SIZE // 8))
+            for start in range(0, self.count, SCAN_DIGESTS):
+                block = np.asarray(words[start:start + SCAN_DIGESTS])
+                first, step = block[:, 0], block[:, 1] | np.uint64(1)
+                for index in range(self.bloom_hashes):
+                    # Doble hashing sobre los propios bytes del digest (ya uniformes); la suma desborda mod 2**64.
+                    positions = (first + np.uint64(index) * step) % np.uint64(self.bloom_bits)
+                    masks = np.left_shift(np.uint8(1), (positions & np.uint64(7)).astype(np.uint8))
+                    np.bitwise_or.at(bloom, positions >> np.uint64(3), masks)
+            del words
+        bloom.tofile(self.bloom_path)
+
+    @classmethod
+    def load(cls, directory: str | Path) -> "KnownHashSet":
+        known = cls(directory)
+        if not known.meta_path.exists() or not known.hashes_path.exists() or not known.bloom_path.exists():
+            raise FileNotFoundError(f"No existe un conjunto de hashes conocidos en {known.directory}")
+        meta = json.loads(known.meta_path.read_text(encoding="utf-8"))
+        known.count = meta["count"]
+        known.bloom_bits = meta["bloom_bits"]
+        known.bloom_hashes = meta["bloom_hashes"]
+        known._open()
+        return known
+
+    def _open(self) -> None:
+        if self.count:
+            self._hashes = np.memmap(self.hashes_path, dtype=DIGEST_DTYPE, mode="r", shape=(self.count,))
+            self._bloom = np.memmap(self.bloom_path, dtype=np.uint8, mode="r", shape=(self.bloom_bits // 8,))
+
+    def __len__(self) -> int:
+        return self.count
+
+    def might_contain(self, digest: bytes) -> bool:
+        """Consulta O(k) al filtro de Bloom; False es definitivo, True admite falsos positivos."""
+        if self._bloom is None:
+            return False
+        first = int.from_bytes(digest[:8], "little")
+        step = int.from_bytes(digest[8:16], "little") | 1
+        for index in range(self.bloom_hashes):
+            position = ((first + index * step) & MASK_64) % self.bloom_bits
+            if not self._bloom[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    def __contains__(self, hash_sha256: object) -> bool:
+        if not isinstance(hash_sha256, str):
+            return False
+        try:
+            digest = bytes.fromhex(hash_sha256)
+        except ValueError:
+            return False
+        if len(digest) != DIGEST_SIZE or not self.might_contain(digest):
+            return False
+        position = int(np.searchsorted(self._hashes, np.void(digest)))
+        return position < self.count and self._hashes[position].tobytes() == digest
+
+    def close(self) -> None:
+        self._hashes = None
+        self._bloom = None